@@ -0,0 +1,129 @@
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from maze_generator import Maze
+from maze_solver import MazeSolver, SEARCHES
+
+# Headless batch runs: every (size, seed) maze is generated once in a pool
+# worker and solved with each requested algorithm, giving one JSONL row per
+# (size, seed, generator, algorithm). Rows are written as jobs finish, and
+# only a few jobs per worker are in flight at a time, so memory stays flat
+# however many jobs there are. A rerun with the same output file skips every
+# row already in it, so an interrupted run picks up where it stopped.
+
+
+def _run_job(job) -> list[dict]:
+    size, seed, generator, algorithms = job
+    start = time.perf_counter()
+    maze = Maze.generated(size, size, generator, seed)
+    gen_s = time.perf_counter() - start
+    solver = MazeSolver(maze)
+    maze.open_mask()
+    rows = []
+    for algorithm in algorithms:
+        start = time.perf_counter()
+        result = solver.solve(algorithm)
+        rows.append({"size": size, "seed": seed, "generator": generator, "algorithm": algorithm,
+                     "gen_s": gen_s, "solve_s": time.perf_counter() - start,
+                     "path_length": len(result.path), "expanded": result.expanded})
+    return rows
+
+
+def _row_key(row) -> tuple:
+    return row["size"], row["seed"], row["generator"], row["algorithm"]
+
+
+def _complete_length(f, chunk: int = 1 << 16) -> int:
+    # Length of `f` up to and including its last newline, found by reading
+    # backwards from the end one chunk at a time
+    end = f.seek(0, os.SEEK_END)
+    while end > 0:
+        start = max(0, end - chunk)
+        f.seek(start)
+        cut = f.read(end - start).rfind(b'\n')
+        if cut >= 0:
+            return start + cut + 1
+        end = start
+    return 0
+
+
+def _finished_rows(path) -> set:
+    # Keys of the rows already in `path`. A line cut short by an interrupted
+    # write is dropped from the file so appending starts on a clean line.
+    # Only the tail is read to find it; the rows themselves are streamed.
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, 'rb+') as f:
+        end = _complete_length(f)
+        if end != os.fstat(f.fileno()).st_size:
+            f.truncate(end)
+        f.seek(0)
+        for line in f:
+            try:
+                done.add(_row_key(json.loads(line)))
+            except (ValueError, KeyError):
+                continue
+    return done
+
+
+def _jobs(sizes, seeds, generator, algorithms, done):
+    for size in sizes:
+        for seed in seeds:
+            todo = [a for a in algorithms if (size, seed, generator, a) not in done]
+            if todo:
+                yield size, seed, generator, todo
+
+
+def run_batch(output, sizes, seeds, generator: str = "dfs", algorithms=tuple(SEARCHES),
+              workers: int | None = None, in_flight: int = 4, progress=sys.stderr) -> int:
+    # Returns the number of rows written by this run
+    workers = workers or os.cpu_count() or 1
+    done = _finished_rows(output)
+    jobs = _jobs(sizes, seeds, generator, algorithms, done)
+    written = 0
+    with open(output, 'a') as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        try:
+            while True:
+                for job in jobs:
+                    pending.add(pool.submit(_run_job, job))
+                    if len(pending) >= workers * in_flight:
+                        break
+                if not pending:
+                    break
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    for row in future.result():
+                        out.write(json.dumps(row) + '\n')
+                        written += 1
+                out.flush()
+                if progress is not None:
+                    print(f"\r{len(done) + written} rows", end='', file=progress, flush=True)
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+        finally:
+            if progress is not None:
+                print(file=progress)
+    return written
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--output", "-o", default="results.jsonl",
+                        help="JSONL file to append to; rows already in it are skipped")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--seeds", type=int, default=100, help="number of seeds per size")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--generator", choices=Maze.ALGORITHMS, default="dfs")
+    parser.add_argument("--algorithms", nargs="+", choices=list(SEARCHES), default=list(SEARCHES))
+    parser.add_argument("--workers", type=int, default=None)
+
+
+def main(args) -> None:
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    run_batch(args.output, args.sizes, seeds, args.generator, args.algorithms, args.workers)
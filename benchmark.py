@@ -0,0 +1,572 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import tempfile
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from maze_generator import Maze
+from maze_queries import solve_batch
+from maze_raster import Raster, export_frames
+from maze_replanner import IncrementalPlanner
+from maze_oracle import TreeOracle, check_against_bfs
+from maze_tiles import generate_tiled
+from maze_solver import MazeSolver, EXPAND, SEARCHES
+
+
+def seeded_maze(size: int, seed: int = 0) -> Maze:
+    random.seed(seed)
+    maze = Maze(size, size)
+    maze.setup()
+    return maze
+
+
+def measure_memory(size: int, generate: bool = True) -> dict:
+    random.seed(size)
+    tracemalloc.start()
+    try:
+        maze = Maze(size, size)
+        walls = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        if generate:
+            maze.generate()
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    cells = size * size
+    return {
+        "size": size,
+        "wall_bytes_per_cell": walls / cells,
+        "peak_bytes_per_cell": peak / cells if generate else None,
+        "generate_s": elapsed if generate else None,
+    }
+
+
+def cmd_memory(args) -> None:
+    for size in args.walls_only:
+        r = measure_memory(size, generate=False)
+        print(f"{size}x{size} walls: {r['wall_bytes_per_cell']:.3f} B/cell")
+    for size in args.sizes:
+        r = measure_memory(size)
+        print(f"{size}x{size} walls: {r['wall_bytes_per_cell']:.3f} B/cell, "
+              f"generate peak: {r['peak_bytes_per_cell']:.3f} B/cell")
+        if args.max_bytes_per_cell and r["peak_bytes_per_cell"] > args.max_bytes_per_cell:
+            raise SystemExit(f"{size}x{size}: peak above {args.max_bytes_per_cell} B/cell")
+
+
+def measure_step_cost(size: int, legacy: bool = False, seed: int = 0) -> dict:
+    maze = seeded_maze(size, seed)
+    solver = MazeSolver(maze)
+    steps = solver.bfs_steps()
+    if legacy:
+        steps = solver.legacy_steps(steps)
+    expanded = 0
+    start = time.perf_counter()
+    for step in steps:
+        if step[0] == EXPAND or (legacy and step[0] != 'done'):
+            expanded += 1
+    elapsed = time.perf_counter() - start
+    return {"size": size, "expanded": expanded, "us_per_step": elapsed / max(expanded, 1) * 1e6}
+
+
+def cmd_steps(args) -> None:
+    for size in args.sizes:
+        r = measure_step_cost(size, legacy=args.legacy, seed=args.seed)
+        print(f"{size}x{size}: {r['expanded']} expansions, {r['us_per_step']:.2f} us/step")
+
+
+def measure_solve(size: int, algorithm: str, seed: int = 0, repeat: int = 3) -> dict:
+    maze = seeded_maze(size, seed)
+    solver = MazeSolver(maze)
+    maze.open_mask()
+    drain, fast, counted = [], [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in solver.steps(algorithm):
+            pass
+        drain.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        result = solver.solve(algorithm)
+        fast.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        solver.solve(algorithm, metrics=True)
+        counted.append(time.perf_counter() - start)
+    return {"size": size, "algorithm": algorithm, "expanded": result.expanded,
+            "path_length": len(result.path), "steps_s": min(drain), "solve_s": min(fast),
+            "metrics_s": min(counted)}
+
+
+def cmd_solve(args) -> None:
+    for size in args.sizes:
+        for algorithm in args.algorithms:
+            r = measure_solve(size, algorithm, seed=args.seed, repeat=args.repeat)
+            print(f"{size}x{size} {algorithm}: {r['expanded']} expanded, "
+                  f"steps {r['steps_s']:.3f}s, solve {r['solve_s']:.3f}s "
+                  f"({r['steps_s'] / r['solve_s']:.1f}x), with metrics {r['metrics_s']:.3f}s")
+
+
+def measure_tiled(size: int, workers: int, seed: int = 0) -> dict:
+    start = time.perf_counter()
+    H, V = generate_tiled(size, size, workers=workers, seed=seed)
+    elapsed = time.perf_counter() - start
+    maze = Maze.from_walls(H, V, (0, 0), (size - 1, size - 1))
+    return {"size": size, "workers": workers, "generate_s": elapsed, "perfect": maze.is_perfect()}
+
+
+def cmd_tiled(args) -> None:
+    for size in args.sizes:
+        base = None
+        for workers in args.workers:
+            r = measure_tiled(size, workers, seed=args.seed)
+            base = base or r["generate_s"]
+            print(f"{size}x{size} workers={workers}: {r['generate_s']:.2f}s "
+                  f"(speedup {base / r['generate_s']:.2f}x), perfect={r['perfect']}")
+            if not r["perfect"]:
+                raise SystemExit(f"{size}x{size} with {workers} workers is not a perfect maze")
+
+
+RENDER_MODES = ("full", "dirty-rect", "viewport")
+
+
+def measure_render(size: int, frames: int = 500, mode: str = "dirty-rect", seed: int = 0) -> dict:
+    # Headless frame rendering: one frame per search expansion. As in the
+    # app, mazes under 2 pixels per cell are drawn through the Viewport, so
+    # "viewport" only applies to those and "full" and "dirty-rect" only to
+    # the others; the other modes are reported as skipped.
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from maze_visualizer import MazeVisualizer
+
+    maze = seeded_maze(size, seed)
+    vis = MazeVisualizer(maze)
+    if vis.use_viewport != (mode == "viewport"):
+        reason = "drawn through the viewport" if vis.use_viewport else "no viewport at this size"
+        return {"size": size, "mode": mode, "skipped": reason}
+    pygame.init()
+    try:
+        screen = pygame.display.set_mode((vis.width, vis.height))
+        viewport = vis.open_viewport() if mode == "viewport" else None
+        start = time.perf_counter()
+        vis.draw_maze(screen)
+        setup_s = time.perf_counter() - start
+        lines = []
+        drawn = 0
+        start = time.perf_counter()
+        for step in MazeSolver(maze).steps("bfs"):
+            if step[0] != EXPAND or step[2] is None:
+                continue
+            if viewport is not None:
+                viewport.mark(*step[1])
+                vis.draw_maze(screen)
+            elif mode == "dirty-rect":
+                pygame.display.update(vis.draw_segment(screen, step[1], step[2], "Breadth-First Search"))
+            else:
+                lines.append((step[1], step[2]))
+                vis.draw_maze(screen, lines=lines, algo_name="Breadth-First Search")
+            drawn += 1
+            if drawn == frames:
+                break
+        elapsed = time.perf_counter() - start
+    finally:
+        pygame.quit()
+    return {"size": size, "mode": mode, "frames": drawn, "fps": drawn / elapsed, "first_frame_s": setup_s}
+
+
+def cmd_render(args) -> None:
+    for size in args.sizes:
+        for mode in RENDER_MODES:
+            r = measure_render(size, frames=args.frames, mode=mode, seed=args.seed)
+            if "skipped" in r:
+                continue
+            print(f"{size}x{size} {mode}: {r['fps']:.0f} fps over {r['frames']} frames "
+                  f"(first frame {r['first_frame_s'] * 1000:.0f} ms)")
+
+
+def measure_raster(size: int, cell_size: int = 2, every: int = 10_000, seed: int = 0) -> dict:
+    # Offscreen rasterizer: one still image, then a BFS frame sequence
+    maze = seeded_maze(size, seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        raster = Raster(maze, cell_size)
+        build_s = time.perf_counter() - start
+        start = time.perf_counter()
+        raster.save(os.path.join(tmp, "maze.png"), level=1)
+        png_s = time.perf_counter() - start
+        frames = export_frames(maze, "bfs", tmp, cell_size=cell_size, every=every)
+    return {"size": size, "pixels": raster.width * raster.height, "build_s": build_s, "png_s": png_s,
+            "frames": frames["frames"], "fps": frames["fps"]}
+
+
+def cmd_raster(args) -> None:
+    for size in args.sizes:
+        r = measure_raster(size, cell_size=args.cell_size, every=args.every, seed=args.seed)
+        print(f"{size}x{size} ({r['pixels'] / 1e6:.1f} Mpx): build {r['build_s']:.3f}s, "
+              f"png {r['png_s']:.3f}s, {r['frames']} frames at {r['fps']:.1f} fps")
+
+
+def measure_replan(size: int, rounds: int = 20, edits: int = 5, braid: float = 0.5, seed: int = 0) -> dict:
+    # Random wall toggles on a braided maze, repaired by the incremental
+    # planner, against a fresh A* after every round
+    maze = seeded_maze(size, seed)
+    maze.braid(braid, seed=seed)
+    rng = random.Random(seed)
+    planner = IncrementalPlanner(maze)
+    start = time.perf_counter()
+    first = planner.plan()
+    first_s = time.perf_counter() - start
+    replan_s = fresh_s = 0.0
+    expanded = reexpanded = fresh = 0
+    for _ in range(rounds):
+        for _ in range(edits):
+            y, x = rng.randrange(size - 1), rng.randrange(size - 1)
+            other = (y + 1, x) if rng.random() < 0.5 else (y, x + 1)
+            planner.set_wall((y, x), other, rng.random() < 0.5)
+        start = time.perf_counter()
+        result = planner.plan()
+        replan_s += time.perf_counter() - start
+        start = time.perf_counter()
+        fresh += MazeSolver(maze).solve("astar").expanded
+        fresh_s += time.perf_counter() - start
+        expanded += result.expanded
+        reexpanded += result.reexpanded
+    return {"size": size, "rounds": rounds, "edits": edits, "first_expanded": first.expanded,
+            "first_s": first_s, "expanded": expanded / rounds, "reexpanded": reexpanded / rounds,
+            "fresh_expanded": fresh / rounds, "replan_s": replan_s / rounds, "fresh_s": fresh_s / rounds}
+
+
+def cmd_replan(args) -> None:
+    for size in args.sizes:
+        r = measure_replan(size, rounds=args.rounds, edits=args.edits, braid=args.braid, seed=args.seed)
+        print(f"{size}x{size}, {r['edits']} edits per round: replan expands {r['expanded']:.0f} "
+              f"({r['reexpanded']:.0f} re-expanded) in {r['replan_s'] * 1000:.1f} ms, "
+              f"fresh A* {r['fresh_expanded']:.0f} in {r['fresh_s'] * 1000:.1f} ms "
+              f"(first plan {r['first_expanded']} in {r['first_s']:.2f}s)")
+
+
+def measure_io(size: int) -> dict:
+    # Save/load timings; the maze is left ungenerated since only the file
+    # size matters
+    maze = Maze(size, size)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.maze")
+        start = time.perf_counter()
+        maze.save(path)
+        save_s = time.perf_counter() - start
+        start = time.perf_counter()
+        Maze.load(path, mmap=True)
+        mmap_s = time.perf_counter() - start
+        start = time.perf_counter()
+        Maze.load(path, mmap=False)
+        read_s = time.perf_counter() - start
+        file_mb = os.path.getsize(path) / 1e6
+    return {"size": size, "file_mb": file_mb, "save_s": save_s, "load_mmap_s": mmap_s, "load_read_s": read_s}
+
+
+def cmd_io(args) -> None:
+    for size in args.sizes:
+        r = measure_io(size)
+        print(f"{size}x{size}: {r['file_mb']:.1f} MB, save {r['save_s'] * 1000:.1f} ms, "
+              f"load mmap {r['load_mmap_s'] * 1000:.2f} ms, load read {r['load_read_s'] * 1000:.1f} ms")
+
+
+def random_pairs(maze: Maze, count: int, seed: int = 0) -> list[tuple]:
+    rng = random.Random(seed)
+    rows, cols = maze.rows, maze.cols
+    return [((rng.randrange(rows), rng.randrange(cols)), (rng.randrange(rows), rng.randrange(cols)))
+            for _ in range(count)]
+
+
+def measure_oracle(size: int, queries: int = 10000, checks: int = 20, seed: int = 0) -> dict:
+    maze = seeded_maze(size, seed)
+    maze.open_mask()
+    start = time.perf_counter()
+    oracle = TreeOracle(maze)
+    build_s = time.perf_counter() - start
+    pairs = random_pairs(maze, queries, seed)
+    start = time.perf_counter()
+    for a, b in pairs:
+        oracle.distance(a, b)
+    query_s = time.perf_counter() - start
+    return {"size": size, "build_s": build_s, "bytes_per_cell": oracle.nbytes / (size * size),
+            "queries_per_s": queries / query_s, "mismatches": len(check_against_bfs(oracle, pairs[:checks]))}
+
+
+def cmd_oracle(args) -> None:
+    for size in args.sizes:
+        r = measure_oracle(size, args.queries, args.checks, args.seed)
+        print(f"{size}x{size}: build {r['build_s']:.2f}s, {r['bytes_per_cell']:.0f} B/cell, "
+              f"{r['queries_per_s']:.0f} distance queries/s, {r['mismatches']} mismatches vs BFS")
+        if r["mismatches"]:
+            raise SystemExit(f"{size}x{size}: oracle disagrees with bfs_steps")
+
+
+def measure_batch(size: int, queries: int, workers: int = 1, braided: bool = False, seed: int = 0) -> dict:
+    maze = seeded_maze(size, seed)
+    if braided:
+        # Knock out some interior walls so the oracle does not apply and
+        # queries go through per-target distance fields
+        rng = random.Random(seed)
+        for _ in range(size * size // 20):
+            maze.H[rng.randrange(1, size)][rng.randrange(size)] = False
+    pairs = random_pairs(maze, queries, seed)
+    if braided:
+        # Realistic workloads repeat targets; use 100 distinct ones
+        targets = [b for _, b in pairs[:100]]
+        pairs = [(a, targets[i % 100]) for i, (a, _) in enumerate(pairs)]
+    start = time.perf_counter()
+    solve_batch(maze, pairs, workers=workers)
+    elapsed = time.perf_counter() - start
+    return {"size": size, "queries": queries, "workers": workers, "braided": braided,
+            "seconds": elapsed, "queries_per_s": queries / elapsed}
+
+
+def cmd_batch(args) -> None:
+    for size in args.sizes:
+        for queries in args.queries:
+            for braided in (False, True):
+                r = measure_batch(size, queries, args.workers, braided, args.seed)
+                kind = "braided" if braided else "perfect"
+                print(f"{size}x{size} {kind}, {queries} queries, {args.workers} workers: "
+                      f"{r['seconds']:.2f}s, {r['queries_per_s']:.0f} queries/s")
+
+
+def measure_contracted(size: int, algorithm: str, queries: int = 20, seed: int = 0) -> dict:
+    maze = seeded_maze(size, seed)
+    solver = MazeSolver(maze)
+    maze.open_mask()
+    start = time.perf_counter()
+    solver.solve(algorithm, contract=True)
+    build_s = time.perf_counter() - start
+    plain = {"expanded": 0, "seconds": 0.0}
+    contracted = {"expanded": 0, "seconds": 0.0}
+    for a, b in random_pairs(maze, queries, seed):
+        maze.set_endpoints(a, b)
+        for contract, totals in ((False, plain), (True, contracted)):
+            start = time.perf_counter()
+            result = solver.solve(algorithm, contract=contract)
+            totals["seconds"] += time.perf_counter() - start
+            totals["expanded"] += result.expanded
+    return {"size": size, "algorithm": algorithm, "junctions": len(solver._junctions.nodes),
+            "build_s": build_s, "plain": plain, "contracted": contracted}
+
+
+def cmd_junctions(args) -> None:
+    for size in args.sizes:
+        for algorithm in ("dijkstra", "astar"):
+            r = measure_contracted(size, algorithm, args.queries, args.seed)
+            p, c = r["plain"], r["contracted"]
+            print(f"{size}x{size} {algorithm}: {r['junctions']} junctions of {size * size} cells "
+                  f"(first solve incl. build {r['build_s']:.2f}s); per {args.queries} queries: "
+                  f"cells {p['expanded']} expanded in {p['seconds']:.2f}s, "
+                  f"junctions {c['expanded']} expanded in {c['seconds']:.2f}s")
+
+
+# The suite runs every case in a fresh worker process so that the peak
+# resident set size reported for a case belongs to that case alone.
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def _run_case(case: dict) -> dict:
+    kind, size, seed, repeat = case["kind"], case["size"], case["seed"], case["repeat"]
+    times = []
+    extra = {}
+    if kind == "generate":
+        for i in range(repeat):
+            random.seed(seed + i)
+            maze = Maze(size, size, case["algorithm"])
+            start = time.perf_counter()
+            maze.generate()
+            times.append(time.perf_counter() - start)
+    elif kind == "solve":
+        maze = seeded_maze(size, seed)
+        solver = MazeSolver(maze)
+        maze.open_mask()
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = solver.solve(case["algorithm"])
+            times.append(time.perf_counter() - start)
+        extra = {"expanded": result.expanded, "path_length": len(result.path)}
+    elif kind == "render":
+        try:
+            import pygame  # noqa: F401
+        except ImportError:
+            return dict(case, skipped="pygame is not installed")
+        for i in range(repeat):
+            r = measure_render(size, frames=case["frames"], mode=case["algorithm"], seed=seed)
+            if "skipped" in r:
+                return dict(case, skipped=r["skipped"])
+            times.append(1 / r["fps"])
+        extra = {"fps": 1 / statistics.median(times)}
+    return dict(case, times=times, median_s=statistics.median(times), min_s=min(times),
+                peak_rss_mb=_peak_rss_mb(), **extra)
+
+
+def suite_cases(sizes, repeat: int, seed: int, frames: int, kinds) -> list[dict]:
+    cases = []
+    for size in sizes:
+        base = {"size": size, "seed": seed, "repeat": repeat}
+        if "generate" in kinds:
+            cases.append(dict(base, kind="generate", algorithm="dfs"))
+        if "solve" in kinds:
+            cases.extend(dict(base, kind="solve", algorithm=a) for a in SEARCHES)
+        if "render" in kinds:
+            cases.extend(dict(base, kind="render", algorithm=mode, frames=frames)
+                         for mode in RENDER_MODES)
+    for case in cases:
+        case["name"] = f"{case['kind']}/{case['algorithm']}/{case['size']}"
+    return cases
+
+
+def compare(results: list[dict], baseline: dict, threshold: float) -> list[str]:
+    # Flags cases whose median time grew by more than `threshold` (0.1 = 10%)
+    old = {r["name"]: r for r in baseline["results"] if "median_s" in r}
+    regressions = []
+    for r in results:
+        before = old.get(r["name"])
+        if before is None or "median_s" not in r:
+            continue
+        ratio = r["median_s"] / before["median_s"]
+        r["baseline_median_s"] = before["median_s"]
+        r["ratio"] = ratio
+        if ratio > 1 + threshold:
+            regressions.append(f"{r['name']}: {before['median_s']:.4f}s -> {r['median_s']:.4f}s ({ratio:.2f}x)")
+    return regressions
+
+
+def cmd_suite(args) -> None:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    cases = suite_cases(args.sizes, args.repeat, args.seed, args.frames, args.kinds)
+    results = []
+    with ProcessPoolExecutor(max_workers=1, max_tasks_per_child=1) as pool:
+        for r in pool.map(_run_case, cases):
+            if "skipped" in r:
+                print(f"{r['name']}: skipped ({r['skipped']})")
+            else:
+                fps = f", {r['fps']:.0f} fps" if "fps" in r else ""
+                print(f"{r['name']}: median {r['median_s'] * 1000:.3f} ms, min {r['min_s'] * 1000:.3f} ms, "
+                      f"peak {r['peak_rss_mb']:.1f} MB{fps}")
+            results.append(r)
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "seed": args.seed, "repeat": args.repeat},
+        "results": results,
+    }
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        report["regressions"] = regressions
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    if regressions:
+        raise SystemExit(1)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Maze generator benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("memory", help="bytes per cell for wall storage and generation")
+    p.add_argument("--sizes", type=int, nargs="+", default=[200, 500])
+    p.add_argument("--walls-only", type=int, nargs="*", default=[10000])
+    p.add_argument("--max-bytes-per-cell", type=float, default=4.0)
+    p.set_defaults(func=cmd_memory)
+
+    p = sub.add_parser("steps", help="per-expansion cost of the BFS step stream")
+    p.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200, 400])
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--legacy", action="store_true", help="replay through the old prev-grid format")
+    p.set_defaults(func=cmd_steps)
+
+    p = sub.add_parser("solve", help="MazeSolver.solve() against draining the step stream")
+    p.add_argument("--sizes", type=int, nargs="+", default=[200, 1000])
+    p.add_argument("--algorithms", nargs="+", default=list(SEARCHES), choices=list(SEARCHES))
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=cmd_solve)
+
+    p = sub.add_parser("tiled", help="tiled multi-process generation scaling and validation")
+    p.add_argument("--sizes", type=int, nargs="+", default=[500, 1000])
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=cmd_tiled)
+
+    p = sub.add_parser("render", help="headless frames per second of the search animation")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100, 300])
+    p.add_argument("--frames", type=int, default=500)
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=cmd_render)
+
+    p = sub.add_parser("replan", help="incremental replanning after wall edits against fresh A*")
+    p.add_argument("--sizes", type=int, nargs="+", default=[100, 300])
+    p.add_argument("--rounds", type=int, default=20)
+    p.add_argument("--edits", type=int, default=5, help="walls toggled per round")
+    p.add_argument("--braid", type=float, default=0.5, help="fraction of dead ends opened up first")
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=cmd_replan)
+
+    p = sub.add_parser("raster", help="offscreen PNG rasterizer: build, encode and frame rate")
+    p.add_argument("--sizes", type=int, nargs="+", default=[500, 2000])
+    p.add_argument("--cell-size", type=int, default=2)
+    p.add_argument("--every", type=int, default=10_000, help="expansions per frame")
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=cmd_raster)
+
+    p = sub.add_parser("io", help="binary maze file save and load times")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    p.set_defaults(func=cmd_io)
+
+    p = sub.add_parser("oracle", help="tree distance oracle build cost, query rate and BFS check")
+    p.add_argument("--sizes", type=int, nargs="+", default=[200, 1000])
+    p.add_argument("--queries", type=int, default=10000)
+    p.add_argument("--checks", type=int, default=20, help="pairs to verify against bfs_steps")
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=cmd_oracle)
+
+    p = sub.add_parser("batch", help="multi-query throughput on one maze")
+    p.add_argument("--sizes", type=int, nargs="+", default=[300])
+    p.add_argument("--queries", type=int, nargs="+", default=[10_000, 1_000_000])
+    p.add_argument("--workers", type=int, default=1)
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("junctions", help="cell search against corridor-contracted search")
+    p.add_argument("--sizes", type=int, nargs="+", default=[300])
+    p.add_argument("--queries", type=int, default=20)
+    p.add_argument("--seed", type=int, default=0)
+    p.set_defaults(func=cmd_junctions)
+
+    p = sub.add_parser("suite", help="generation, every solver and rendering; JSON results")
+    p.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000, 3000])
+    p.add_argument("--kinds", nargs="+", default=["generate", "solve", "render"],
+                   choices=["generate", "solve", "render"])
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--frames", type=int, default=200, help="frames per render repetition")
+    p.add_argument("--output", help="write results as JSON to this file")
+    p.add_argument("--baseline", help="JSON from an earlier run to compare against")
+    p.add_argument("--threshold", type=float, default=0.1,
+                   help="flag cases whose median time grew by more than this fraction")
+    p.set_defaults(func=cmd_suite)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+class BitGrid:
+    # A rows x cols grid of booleans packed 8 per byte, row-major.
+    # grid[y][x] reads and writes like the list-of-lists it replaces.
+    # Writes through set() or grid[y][x] = ... call on_change(), so an
+    # owner can drop whatever it derived from the grid; code writing to
+    # `data` directly has to do that itself.
+    def __init__(self, rows: int, cols: int, fill: bool = True, data=None):
+        self.rows = rows
+        self.cols = cols
+        if data is None:
+            data = bytearray(b'\xff' if fill else b'\x00') * self.nbytes_for(rows, cols)
+        self.data = data
+        self.on_change = None
+
+    @staticmethod
+    def nbytes_for(rows: int, cols: int) -> int:
+        return (rows * cols + 7) // 8
+
+    @property
+    def nbytes(self) -> int:
+        return self.nbytes_for(self.rows, self.cols)
+
+    def get(self, y: int, x: int) -> bool:
+        i = y * self.cols + x
+        return bool(self.data[i >> 3] >> (i & 7) & 1)
+
+    def set(self, y: int, x: int, value: bool) -> None:
+        i = y * self.cols + x
+        if value:
+            self.data[i >> 3] |= 1 << (i & 7)
+        else:
+            self.data[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+        if self.on_change is not None:
+            self.on_change()
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, y: int) -> "BitRow":
+        if y < 0:
+            y += self.rows
+        if not 0 <= y < self.rows:
+            raise IndexError("BitGrid row index out of range")
+        return BitRow(self, y)
+
+    def __iter__(self):
+        for y in range(self.rows):
+            yield BitRow(self, y)
+
+    def unpack(self) -> bytes:
+        # One byte (0 or 1) per cell, row-major. Works a bit plane at a time
+        # on big integers so the loop runs 8 times instead of once per cell.
+        n = self.rows * self.cols
+        nbytes = self.nbytes
+        value = int.from_bytes(self.data[:nbytes], 'little')
+        ones = int.from_bytes(b'\x01' * nbytes, 'little')
+        out = bytearray(nbytes * 8)
+        for k in range(8):
+            out[k::8] = ((value >> k) & ones).to_bytes(nbytes, 'little')
+        del out[n:]
+        return bytes(out)
+
+    @classmethod
+    def pack(cls, rows: int, cols: int, plane) -> "BitGrid":
+        # Inverse of unpack(): plane holds one byte (0 or 1) per cell.
+        n = rows * cols
+        if len(plane) != n:
+            raise ValueError(f"expected {n} bytes, got {len(plane)}")
+        plane = bytes(plane) + bytes(-n % 8)
+        nbytes = len(plane) // 8
+        value = 0
+        for k in range(8):
+            value |= int.from_bytes(plane[k::8], 'little') << k
+        return cls(rows, cols, data=bytearray(value.to_bytes(nbytes, 'little')))
+
+
+class BitRow:
+    __slots__ = ('grid', 'offset')
+
+    def __init__(self, grid: BitGrid, y: int):
+        self.grid = grid
+        self.offset = y * grid.cols
+
+    def __len__(self) -> int:
+        return self.grid.cols
+
+    def _index(self, x: int) -> int:
+        cols = self.grid.cols
+        if x < 0:
+            x += cols
+        if not 0 <= x < cols:
+            raise IndexError("BitGrid column index out of range")
+        return self.offset + x
+
+    def __getitem__(self, x: int) -> bool:
+        i = self._index(x)
+        return bool(self.grid.data[i >> 3] >> (i & 7) & 1)
+
+    def __setitem__(self, x: int, value: bool) -> None:
+        i = self._index(x)
+        grid = self.grid
+        if value:
+            grid.data[i >> 3] |= 1 << (i & 7)
+        else:
+            grid.data[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+        if grid.on_change is not None:
+            grid.on_change()
+
+    def __iter__(self):
+        data = self.grid.data
+        for i in range(self.offset, self.offset + self.grid.cols):
+            yield bool(data[i >> 3] >> (i & 7) & 1)
+
+    def __eq__(self, other) -> bool:
+        return list(self) == list(other)
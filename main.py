@@ -1,9 +1,31 @@
+import argparse
+
+import batch_runner
+import maze_raster
+from maze_cache import MazeCache
 from maze_generator import Maze
-from maze_visualizer import MazeVisualizer
 
-def main():
-    m = Maze(50, 50)
-    MazeVisualizer(m).run()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maze generator and solver")
+    parser.add_argument("--size", type=int, default=50, help="maze rows and columns for the window")
+    parser.add_argument("--generator", choices=Maze.ALGORITHMS, default="dfs")
+    sub = parser.add_subparsers(dest="command")
+    batch = sub.add_parser("batch", help="generate and solve many mazes without a window, writing JSONL")
+    batch_runner.add_arguments(batch)
+    export = sub.add_parser("export", help="write a PNG of a maze, or PNG frames of a search, without a window")
+    maze_raster.add_arguments(export)
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        batch_runner.main(args)
+        return
+    if args.command == "export":
+        maze_raster.main(args)
+        return
+    # pygame is only imported when a window is actually opened
+    from maze_visualizer import MazeVisualizer
+    m = Maze(args.size, args.size, args.generator)
+    with MazeCache() as cache:
+        MazeVisualizer(m, cache=cache).run()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,128 @@
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from maze_generator import Maze
+from maze_io import load_maze, maze_from_buffer, maze_to_bytes
+
+
+def _generate(key) -> bytes:
+    # Runs in a prefetch worker; the maze travels back in its file format
+    return maze_to_bytes(Maze.generated(*key))
+
+
+class MazeCache:
+    # Finished mazes keyed by (rows, cols, algorithm, seed). The most
+    # recently used `capacity` stay in memory; with a directory, every maze
+    # is also written there as a .maze file and mapped back in on a miss.
+    # The directory keeps at most `disk_capacity` files. A file's mtime is
+    # set whenever it is written or loaded, and the oldest go first.
+    # prefetch() generates keys ahead of time in worker processes, so a
+    # later get() is a dictionary lookup instead of a generation run.
+    #
+    # Mazes are shared between callers of get(); copy one (e.g. through
+    # maze_to_bytes) before editing its walls.
+    def __init__(self, capacity: int = 8, directory=None, workers: int = 1,
+                 disk_capacity: int = 64):
+        self.capacity = capacity
+        self.directory = directory
+        self.disk_capacity = disk_capacity
+        self.workers = workers
+        self._mazes = OrderedDict()
+        self._pending = {}
+        self._pool = None
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key) -> str:
+        rows, cols, algorithm, seed = key
+        return os.path.join(self.directory, f"{rows}x{cols}-{algorithm}-{seed}.maze")
+
+    def _store(self, key, maze: Maze, data: bytes | None = None) -> None:
+        mazes = self._mazes
+        mazes[key] = maze
+        mazes.move_to_end(key)
+        while len(mazes) > self.capacity:
+            mazes.popitem(last=False)
+        if self.directory is not None:
+            path = self._path(key)
+            if not os.path.exists(path):
+                # Written under a temporary name so a crash never leaves a
+                # truncated file behind
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, 'wb') as f:
+                    f.write(data if data is not None else maze_to_bytes(maze))
+                os.replace(tmp, path)
+            self._touch(path)
+            self._evict_files()
+
+    @staticmethod
+    def _touch(path) -> None:
+        # Filesystem timestamps can be coarser than the gap between two
+        # uses, so the current time is set explicitly
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+    def _evict_files(self) -> None:
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.name.endswith('.maze'):
+                    try:
+                        files.append((entry.stat().st_mtime_ns, entry.path))
+                    except FileNotFoundError:
+                        continue  # removed by another process meanwhile
+        files.sort()
+        for _, path in files[:max(0, len(files) - self.disk_capacity)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def __contains__(self, key) -> bool:
+        return key in self._mazes or key in self._pending
+
+    def get(self, rows: int, cols: int, algorithm: str = "dfs", seed: int = 0) -> Maze:
+        key = (rows, cols, algorithm, seed)
+        mazes = self._mazes
+        if key in mazes:
+            mazes.move_to_end(key)
+            return mazes[key]
+        future = self._pending.pop(key, None)
+        if future is not None:
+            # Waits if the prefetcher has not finished this one yet
+            data = future.result()
+            maze = maze_from_buffer(data)
+        elif self.directory is not None and os.path.exists(self._path(key)):
+            data = None
+            maze = load_maze(self._path(key))
+        else:
+            data = None
+            maze = Maze.generated(*key)
+        self._store(key, maze, data)
+        return maze
+
+    def prefetch(self, rows: int, cols: int, algorithm: str = "dfs", seeds=()) -> None:
+        # Queues generation of every seed not already cached or on its way
+        for seed in seeds:
+            key = (rows, cols, algorithm, seed)
+            if key in self:
+                continue
+            if self.directory is not None and os.path.exists(self._path(key)):
+                continue
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            self._pending[key] = self._pool.submit(_generate, key)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        self._pending.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,23 +1,168 @@
 import random
+from array import array
+
+from bit_grid import BitGrid
+from maze_tiles import generate_tiled
+
+# Bits of Maze.open_mask(): which neighbors a cell has an open passage to
+OPEN_N = 1
+OPEN_S = 2
+OPEN_W = 4
+OPEN_E = 8
+
+# bytes.translate tables over open-mask bytes
+_INVERT_WALLS = bytes(~b & 0x0F for b in range(256))
+_CLEAR_N = bytes(b & ~OPEN_N for b in range(256))
+_CLEAR_S = bytes(b & ~OPEN_S for b in range(256))
+_CLEAR_W = bytes(b & ~OPEN_W for b in range(256))
+_CLEAR_E = bytes(b & ~OPEN_E for b in range(256))
+# Number of open directions in an open-mask byte
+POPCOUNT = bytes(bin(b).count('1') for b in range(256))
+
+
+def move_table(cols: int) -> list[tuple[int, ...]]:
+    # For each open mask, the flat-index offsets of the open neighbours in
+    # N, S, W, E order, so `for d in moves[mask[cell]]` visits them
+    offsets = ((OPEN_N, -cols), (OPEN_S, cols), (OPEN_W, -1), (OPEN_E, 1))
+    return [tuple(d for bit, d in offsets if m & bit) for m in range(16)]
+
+
+def eller_rows(cols: int, rows: int | None = None, rng=random):
+    # Eller's algorithm: yields (v_row, h_row) for each maze row y, where
+    # v_row is V[y] (cols + 1 walls) and h_row is H[y + 1], the floor of the
+    # row (cols walls). Only the current row's set labels are kept, so
+    # memory is O(cols) however many rows are produced. With rows=None the
+    # stream never ends and no closing row is emitted.
+    next_label = 0
+    labels = [-1] * cols
+    members: dict[int, list[int]] = {}
+    y = 0
+    while rows is None or y < rows:
+        last = rows is not None and y == rows - 1
+        # Cells without a passage from above start in sets of their own
+        for x in range(cols):
+            if labels[x] < 0:
+                labels[x] = next_label
+                members[next_label] = [x]
+                next_label += 1
+        v_row = [True] * (cols + 1)
+        # Join horizontally adjacent cells from different sets
+        for x in range(cols - 1):
+            a, b = labels[x], labels[x + 1]
+            if a != b and (last or rng.random() < 0.5):
+                v_row[x + 1] = False
+                if len(members[a]) < len(members[b]):
+                    a, b = b, a
+                for m in members[b]:
+                    labels[m] = a
+                members[a].extend(members.pop(b))
+        h_row = [True] * cols
+        if last:
+            yield v_row, h_row
+            return
+        # Every set carries on downward through at least one cell
+        below = [-1] * cols
+        carried: dict[int, list[int]] = {}
+        for label, cells in members.items():
+            down = [x for x in cells if rng.random() < 0.5] or [rng.choice(cells)]
+            for x in down:
+                h_row[x] = False
+                below[x] = label
+            carried[label] = down
+        labels, members = below, carried
+        yield v_row, h_row
+        y += 1
+
 
 class Maze:
-    def __init__(self, rows: int, cols: int):
+    ALGORITHMS = ("dfs", "eller", "tiled")
+
+    def __init__(self, rows: int, cols: int, algorithm: str = "dfs"):
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"unknown generation algorithm {algorithm!r}")
         self.rows = rows
         self.cols = cols
+        self.algorithm = algorithm
+        # `version` is bumped on every change to walls, start or target so
+        # renderers and other caches can tell when to rebuild; `walls_version`
+        # only on wall changes, for caches that do not depend on the endpoints
+        self.version = 0
+        self.walls_version = 0
+        self.seed = None
         self._init_walls()
         self._init_start_target()
 
+    @classmethod
+    def from_walls(cls, H: BitGrid, V: BitGrid, start: tuple[int, int], target: tuple[int, int],
+                   seed: int | None = None, algorithm: str = "dfs") -> "Maze":
+        # Wraps existing wall grids (e.g. loaded from disk) without
+        # allocating or randomizing anything
+        maze = cls.__new__(cls)
+        maze.rows = V.rows
+        maze.cols = H.cols
+        maze.algorithm = algorithm
+        maze.version = 0
+        maze.walls_version = 0
+        maze.seed = seed
+        maze.start = start
+        maze.target = target
+        maze._set_walls(H, V)
+        return maze
+
+    def save(self, path) -> None:
+        from maze_io import save_maze
+        save_maze(self, path)
+
+    @classmethod
+    def load(cls, path, mmap: bool = True) -> "Maze":
+        from maze_io import load_maze
+        return load_maze(path, mmap=mmap)
+
     def _init_walls(self) -> None:
-        self.H = [[True for _ in range(self.cols)] for _ in range(self.rows + 1)]
-        self.V = [[True for _ in range(self.cols + 1)] for _ in range(self.rows)]
+        # Walls are bit-packed: H is (rows+1) x cols, V is rows x (cols+1),
+        # about 2 bits (0.25 bytes) per cell in total.
+        self._set_walls(BitGrid(self.rows + 1, self.cols), BitGrid(self.rows, self.cols + 1))
+
+    def _set_walls(self, H: BitGrid, V: BitGrid) -> None:
+        # Writes through H[y][x] = ... or set() call walls_changed()
+        self.H, self.V = H, V
+        H.on_change = V.on_change = self.walls_changed
+        self.walls_changed()
+
+    def walls_changed(self) -> None:
+        # Called on every write to H or V, so cached views are rebuilt; code
+        # writing to their `data` directly must call it too
+        self._open_mask = None
+        self.version += 1
+        self.walls_version += 1
+
+    # Moving either endpoint bumps `version`, whether through set_endpoints()
+    # or plain assignment
+    @property
+    def start(self) -> tuple[int, int]:
+        return self._start
 
-    def _init_start_target(self) -> None:
-        self.target = (random.randint(0, self.rows - 1), random.randint(0, self.cols - 1))
+    @start.setter
+    def start(self, cell) -> None:
+        self._start = tuple(cell)
+        self.version += 1
+
+    @property
+    def target(self) -> tuple[int, int]:
+        return self._target
+
+    @target.setter
+    def target(self, cell) -> None:
+        self._target = tuple(cell)
+        self.version += 1
+
+    def _init_start_target(self, rng=random) -> None:
+        self.target = (rng.randint(0, self.rows - 1), rng.randint(0, self.cols - 1))
         border_cells = [(0, i) for i in range(self.cols)] + \
                        [(self.rows - 1, i) for i in range(self.cols)] + \
                        [(i, 0) for i in range(1, self.rows - 1)] + \
                        [(i, self.cols - 1) for i in range(1, self.rows - 1)]
-        self.start = random.choice(border_cells)
+        self.start = rng.choice(border_cells)
         sy, sx = self.start
         if sy == 0:
             self.H[0][sx] = False
@@ -28,45 +173,92 @@ class Maze:
         elif sx == self.cols - 1:
             self.V[sy][self.cols] = False
 
-    def generate(self) -> None:
-        stack = []
-        visited = [[False for _ in range(self.cols)] for _ in range(self.rows)]
-        start_y = random.randint(0, self.rows - 1)
-        start_x = random.randint(0, self.cols - 1)
-        stack.append((start_y, start_x))
-        visited[start_y][start_x] = True
+    def generate(self, rng=random) -> None:
+        if self.algorithm == "eller":
+            self._generate_eller(rng)
+        elif self.algorithm == "tiled":
+            self._set_walls(*generate_tiled(self.rows, self.cols, seed=rng.getrandbits(64)))
+        else:
+            self._generate_dfs(rng)
+        self.walls_changed()
+
+    def _generate_eller(self, rng) -> None:
+        # Bits are cleared in the planes directly; generate() calls
+        # walls_changed() once at the end
+        cols = self.cols
+        h, v = self.H.data, self.V.data
+        for y, (v_row, h_row) in enumerate(eller_rows(cols, self.rows, rng)):
+            row = y * (cols + 1)
+            for x, wall in enumerate(v_row):
+                if not wall:
+                    i = row + x
+                    v[i >> 3] &= ~(1 << (i & 7))
+            row = (y + 1) * cols
+            for x, wall in enumerate(h_row):
+                if not wall:
+                    i = row + x
+                    h[i >> 3] &= ~(1 << (i & 7))
+
+    def _generate_dfs(self, rng) -> None:
+        rows, cols = self.rows, self.cols
+        h, v = self.H.data, self.V.data
+        # Cells are flat indices y * cols + x. The visited set is a bitset and
+        # the stack an array of 4-byte indices, so generation needs 1 bit per
+        # cell plus at most 4 bytes per cell on the stack.
+        visited = bytearray((rows * cols + 7) // 8)
+        start_y = rng.randint(0, rows - 1)
+        start_x = rng.randint(0, cols - 1)
+        cell = start_y * cols + start_x
+        stack = array('I', [cell])
+        visited[cell >> 3] |= 1 << (cell & 7)
         while stack:
-            y, x = stack[-1]
+            cell = stack[-1]
+            y, x = divmod(cell, cols)
             neighbors = []
-            # Check each direction for unvisited neighbors
-            if y > 0 and not visited[y-1][x]:
-                neighbors.append(('N', y-1, x))
-            if y < self.rows-1 and not visited[y+1][x]:
-                neighbors.append(('S', y+1, x))
-            if x > 0 and not visited[y][x-1]:
-                neighbors.append(('W', y, x-1))
-            if x < self.cols-1 and not visited[y][x+1]:
-                neighbors.append(('E', y, x+1))
+            # Check each direction for unvisited neighbors, remembering which
+            # wall bit separates us from it
+            if y > 0:
+                n = cell - cols
+                if not visited[n >> 3] >> (n & 7) & 1:
+                    neighbors.append((n, h, cell))
+            if y < rows - 1:
+                n = cell + cols
+                if not visited[n >> 3] >> (n & 7) & 1:
+                    neighbors.append((n, h, n))
+            if x > 0:
+                n = cell - 1
+                if not visited[n >> 3] >> (n & 7) & 1:
+                    neighbors.append((n, v, cell + y))
+            if x < cols - 1:
+                n = cell + 1
+                if not visited[n >> 3] >> (n & 7) & 1:
+                    neighbors.append((n, v, cell + y + 1))
             if neighbors:
-                direction, ny, nx = random.choice(neighbors)
+                n, walls, i = rng.choice(neighbors)
                 # Remove wall between current and neighbor
-                if direction == 'N':
-                    self.H[y][x] = False
-                elif direction == 'S':
-                    self.H[y+1][x] = False
-                elif direction == 'W':
-                    self.V[y][x] = False
-                elif direction == 'E':
-                    self.V[y][x+1] = False
-                visited[ny][nx] = True
-                stack.append((ny, nx))
+                walls[i >> 3] &= ~(1 << (i & 7))
+                visited[n >> 3] |= 1 << (n & 7)
+                stack.append(n)
             else:
                 stack.pop()
 
-    def setup(self) -> None:
+    def setup(self, seed: int | None = None) -> None:
+        # The same (rows, cols, algorithm, seed) always gives the same maze.
+        # Without a seed the global random module is used, as before. The
+        # seed is saved with the maze as a signed 64-bit integer.
+        if seed is not None and not (isinstance(seed, int) and -1 << 63 <= seed < 1 << 63):
+            raise ValueError(f"seed must be a signed 64-bit integer, not {seed!r}")
+        rng = random.Random(seed) if seed is not None else random
+        self.seed = seed
         self._init_walls()
-        self.generate()
-        self._init_start_target()
+        self.generate(rng)
+        self._init_start_target(rng)
+
+    @classmethod
+    def generated(cls, rows: int, cols: int, algorithm: str = "dfs", seed: int | None = None) -> "Maze":
+        maze = cls(rows, cols, algorithm)
+        maze.setup(seed)
+        return maze
 
     def neighbors(self, y: int, x: int) -> list[tuple[int, int]]:
         nbrs = []
@@ -80,3 +272,115 @@ class Maze:
         if x < self.cols-1 and not self.V[y][x+1]:
             nbrs.append((y, x+1))
         return nbrs
+
+    def set_wall(self, a: tuple[int, int], b: tuple[int, int], wall: bool) -> None:
+        # Closes (wall=True) or opens the wall between two adjacent cells,
+        # patching the cached open mask instead of rebuilding it
+        (ay, ax), (by, bx) = sorted((tuple(a), tuple(b)))
+        if (by - ay, bx - ax) not in ((1, 0), (0, 1)) or ay < 0 or ax < 0 \
+                or by >= self.rows or bx >= self.cols:
+            raise ValueError(f"cells {a} and {b} are not adjacent cells of the maze")
+        # The bit is written to the plane directly, since going through
+        # set() would drop the mask this method patches
+        if by != ay:
+            data, i = self.H.data, by * self.cols + bx
+            bit_a, bit_b = OPEN_S, OPEN_N
+        else:
+            data, i = self.V.data, ay * (self.cols + 1) + bx
+            bit_a, bit_b = OPEN_E, OPEN_W
+        if wall:
+            data[i >> 3] |= 1 << (i & 7)
+        else:
+            data[i >> 3] &= ~(1 << (i & 7)) & 0xFF
+        mask = self._open_mask
+        if mask is not None:
+            i, j = ay * self.cols + ax, by * self.cols + bx
+            if wall:
+                mask[i] &= ~bit_a
+                mask[j] &= ~bit_b
+            else:
+                mask[i] |= bit_a
+                mask[j] |= bit_b
+        self.version += 1
+        self.walls_version += 1
+
+    def set_endpoints(self, start: tuple[int, int] | None = None,
+                      target: tuple[int, int] | None = None) -> None:
+        if start is not None:
+            self.start = start
+        if target is not None:
+            self.target = target
+
+    def braid(self, fraction: float = 0.5, seed: int | None = None) -> int:
+        # Turns a perfect maze into one with loops: each dead end is, with
+        # probability `fraction`, opened into a walled-off neighbour,
+        # preferring neighbours that are dead ends too. Returns the number
+        # of walls opened.
+        rng = random.Random(seed) if seed is not None else random
+        rows, cols = self.rows, self.cols
+        mask = self.open_mask()
+        opened = 0
+        for cell in [i for i, d in enumerate(mask.translate(POPCOUNT)) if d == 1]:
+            if POPCOUNT[mask[cell]] != 1 or rng.random() >= fraction:
+                continue
+            y, x = divmod(cell, cols)
+            walled = [(ny, nx) for bit, ny, nx in ((OPEN_N, y - 1, x), (OPEN_S, y + 1, x),
+                                                   (OPEN_W, y, x - 1), (OPEN_E, y, x + 1))
+                      if not mask[cell] & bit and 0 <= ny < rows and 0 <= nx < cols]
+            if not walled:
+                continue
+            dead = [c for c in walled if POPCOUNT[mask[c[0] * cols + c[1]]] == 1]
+            self.set_wall((y, x), rng.choice(dead or walled), False)
+            opened += 1
+        return opened
+
+    def open_mask(self) -> bytearray:
+        # One byte per cell (index y * cols + x) of OPEN_* bits, built from
+        # the wall planes with whole-plane bytes/int operations and cached
+        # until walls_changed(). Passages through the outer border are never
+        # reported, matching neighbors().
+        if self._open_mask is not None:
+            return self._open_mask
+        rows, cols = self.rows, self.cols
+        n = rows * cols
+        h = self.H.unpack()
+        v = self.V.unpack()
+        stride = cols + 1
+        west = b''.join(v[y * stride:y * stride + cols] for y in range(rows))
+        east = b''.join(v[y * stride + 1:(y + 1) * stride] for y in range(rows))
+        # Plane bytes are 0 or 1, so shifting the whole integer by < 4 bits
+        # never carries into the neighbouring byte
+        walls = (int.from_bytes(h[:n], 'little')
+                 | int.from_bytes(h[cols:], 'little') << 1
+                 | int.from_bytes(west, 'little') << 2
+                 | int.from_bytes(east, 'little') << 3)
+        mask = bytearray(walls.to_bytes(n, 'little').translate(_INVERT_WALLS))
+        mask[:cols] = mask[:cols].translate(_CLEAR_N)
+        mask[n - cols:] = mask[n - cols:].translate(_CLEAR_S)
+        mask[::cols] = mask[::cols].translate(_CLEAR_W)
+        mask[cols - 1::cols] = mask[cols - 1::cols].translate(_CLEAR_E)
+        # Kept as a bytearray so set_wall() can patch it in place
+        self._open_mask = mask
+        return self._open_mask
+
+    def is_perfect(self) -> bool:
+        # A perfect maze is a spanning tree of the cells: exactly
+        # cells - 1 passages, and every cell reachable from cell 0.
+        cols = self.cols
+        cells = self.rows * cols
+        mask = self.open_mask()
+        if sum(mask.translate(POPCOUNT)) != 2 * (cells - 1):
+            return False
+        moves = move_table(cols)
+        seen = bytearray(cells)
+        seen[0] = 1
+        stack = [0]
+        reached = 1
+        while stack:
+            cell = stack.pop()
+            for d in moves[mask[cell]]:
+                if not seen[cell + d]:
+                    seen[cell + d] = 1
+                    reached += 1
+                    stack.append(cell + d)
+        return reached == cells
@@ -0,0 +1,142 @@
+import mmap
+import struct
+
+from bit_grid import BitGrid
+from maze_generator import Maze
+
+# Maze file, version 1, little-endian:
+#   header (64 bytes): magic b'MAZE', version u16, flags u16, rows u32,
+#     cols u32, start y/x u32, target y/x u32, seed i64, generation
+#     algorithm u8 (index into Maze.ALGORITHMS), then zero padding
+#   H plane: (rows + 1) x cols walls, bit-packed as in BitGrid
+#   V plane: rows x (cols + 1) walls, bit-packed
+# flags bit 0 is set when the seed field is meaningful. Files written
+# before the algorithm byte existed have 0 there, which reads as "dfs".
+#
+# Archive, version 1: a 32-byte header (magic b'MZAR', version u16,
+# reserved u16, count u32, index offset u64, zero padding), maze records
+# as above each starting on an 8-byte boundary, then an index of `count`
+# (offset u64, length u64) pairs so any maze can be read without
+# scanning the others.
+MAGIC = b'MAZE'
+ARCHIVE_MAGIC = b'MZAR'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIIIIIqB')
+HEADER_SIZE = 64
+ARCHIVE_HEADER = struct.Struct('<4sHHIQ')
+ARCHIVE_HEADER_SIZE = 32
+INDEX_ENTRY = struct.Struct('<QQ')
+FLAG_SEED = 1
+
+
+def maze_to_bytes(maze: Maze) -> bytes:
+    flags = FLAG_SEED if maze.seed is not None else 0
+    header = HEADER.pack(MAGIC, VERSION, flags, maze.rows, maze.cols, *maze.start, *maze.target,
+                         maze.seed if maze.seed is not None else 0,
+                         Maze.ALGORITHMS.index(maze.algorithm))
+    return b''.join((header.ljust(HEADER_SIZE, b'\0'),
+                     bytes(maze.H.data[:maze.H.nbytes]), bytes(maze.V.data[:maze.V.nbytes])))
+
+
+def maze_from_buffer(buf, copy: bool = True) -> Maze:
+    # With copy=False the wall grids are views into buf (for example an
+    # mmap), so nothing is read until it is touched
+    view = memoryview(buf)
+    if len(view) < HEADER_SIZE:
+        raise ValueError("truncated maze header")
+    magic, version, flags, rows, cols, sy, sx, ty, tx, seed, algorithm = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError(f"not a maze file (magic {magic!r})")
+    if version != VERSION:
+        raise ValueError(f"unsupported maze file version {version}")
+    if algorithm >= len(Maze.ALGORITHMS):
+        raise ValueError(f"unknown generation algorithm code {algorithm}")
+    h_size = BitGrid.nbytes_for(rows + 1, cols)
+    v_size = BitGrid.nbytes_for(rows, cols + 1)
+    if len(view) < HEADER_SIZE + h_size + v_size:
+        raise ValueError("truncated maze wall planes")
+    h = view[HEADER_SIZE:HEADER_SIZE + h_size]
+    v = view[HEADER_SIZE + h_size:HEADER_SIZE + h_size + v_size]
+    if copy:
+        h, v = bytearray(h), bytearray(v)
+    H = BitGrid(rows + 1, cols, data=h)
+    V = BitGrid(rows, cols + 1, data=v)
+    return Maze.from_walls(H, V, (sy, sx), (ty, tx), seed if flags & FLAG_SEED else None,
+                           Maze.ALGORITHMS[algorithm])
+
+
+def _map_file(path) -> mmap.mmap:
+    # Copy-on-write mapping: pages are shared with every other process that
+    # maps the same file until someone edits a wall in memory, and edits
+    # never reach the file
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+
+def save_maze(maze: Maze, path) -> None:
+    with open(path, 'wb') as f:
+        f.write(maze_to_bytes(maze))
+
+
+def load_maze(path, mmap: bool = True) -> Maze:
+    if mmap:
+        return maze_from_buffer(_map_file(path), copy=False)
+    with open(path, 'rb') as f:
+        return maze_from_buffer(f.read())
+
+
+class MazeArchiveWriter:
+    def __init__(self, path):
+        self._file = open(path, 'wb')
+        self._file.write(bytes(ARCHIVE_HEADER_SIZE))
+        self._index = []
+
+    def add(self, maze: Maze) -> int:
+        # Appends a maze and returns its position in the archive
+        f = self._file
+        f.write(bytes(-f.tell() % 8))
+        record = maze_to_bytes(maze)
+        self._index.append((f.tell(), len(record)))
+        f.write(record)
+        return len(self._index) - 1
+
+    def close(self) -> None:
+        f = self._file
+        if f.closed:
+            return
+        f.write(bytes(-f.tell() % 8))
+        index_offset = f.tell()
+        for entry in self._index:
+            f.write(INDEX_ENTRY.pack(*entry))
+        f.seek(0)
+        f.write(ARCHIVE_HEADER.pack(ARCHIVE_MAGIC, VERSION, 0, len(self._index), index_offset))
+        f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MazeArchive:
+    def __init__(self, path):
+        self._map = _map_file(path)
+        magic, version, _, count, index_offset = ARCHIVE_HEADER.unpack_from(self._map)
+        if magic != ARCHIVE_MAGIC:
+            raise ValueError(f"not a maze archive (magic {magic!r})")
+        if version != VERSION:
+            raise ValueError(f"unsupported maze archive version {version}")
+        self._index = [INDEX_ENTRY.unpack_from(self._map, index_offset + i * INDEX_ENTRY.size)
+                       for i in range(count)]
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, i: int) -> Maze:
+        offset, length = self._index[i]
+        return maze_from_buffer(memoryview(self._map)[offset:offset + length], copy=False)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
@@ -0,0 +1,135 @@
+import heapq
+
+from maze_generator import Maze, POPCOUNT, move_table
+
+
+
+class JunctionGraph:
+    # Corridor contraction: every chain of cells with exactly two open
+    # neighbours is collapsed into one weighted edge between the cells at
+    # its ends (junctions and dead ends), so weighted searches only push
+    # and pop those end cells. Edges remember the first move out of their
+    # source cell; the cells in between are recovered by walking the
+    # corridor again, which keeps the graph small.
+    #
+    # adj[node] is a list of (neighbour node, corridor length, first move)
+    # with moves as flat-index deltas. Node ids are flat cell indices.
+    def __init__(self, maze: Maze):
+        cols = maze.cols
+        cells = maze.rows * cols
+        mask = maze.open_mask()
+        self.maze = maze
+        self.cols = cols
+        self.mask = mask
+        self.moves = move_table(cols)
+        self.degree = mask.translate(POPCOUNT)
+        nodes = [i for i, d in enumerate(self.degree) if d != 2]
+        if not nodes and cells:
+            # A maze that is one single loop still needs a node on it
+            nodes = [0]
+        self.nodes = set(nodes)
+        self.adj = {}
+        for node in nodes:
+            edges = []
+            for d in self.moves[mask[node]]:
+                end, length, _ = self._walk(node, d)
+                if end != node:
+                    edges.append((end, length, d))
+            self.adj[node] = edges
+        self.walls_version = maze.walls_version
+
+    def _walk(self, cell: int, move: int, stop: int = -1):
+        # Follows a corridor from `cell` starting with `move` until reaching
+        # a node, `stop`, or back where it began (a corridor that is a closed
+        # loop). Returns (end cell, moves taken, last move).
+        mask, moves, nodes = self.mask, self.moves, self.nodes
+        origin = cell
+        length = 0
+        while True:
+            cell += move
+            length += 1
+            if cell in nodes or cell == stop or cell == origin:
+                return cell, length, move
+            back = -move
+            for move in moves[mask[cell]]:
+                if move != back:
+                    break
+
+    def _cells(self, cell: int, move: int, length: int) -> list[int]:
+        # The `length` cells reached by walking a corridor from `cell`
+        mask, moves = self.mask, self.moves
+        out = []
+        for _ in range(length):
+            cell += move
+            out.append(cell)
+            back = -move
+            for move in moves[mask[cell]]:
+                if move != back:
+                    break
+        return out
+
+    def search(self, start: tuple[int, int], target: tuple[int, int], heuristic: bool = True):
+        # Dijkstra (heuristic=False) or A* over the junction graph. Returns
+        # (path as (y, x) cells, graph nodes expanded, heap pushes).
+        cols = self.cols
+        s = start[0] * cols + start[1]
+        t = target[0] * cols + target[1]
+        ty, tx = target
+        # Splice start and target into the graph when they sit mid-corridor
+        extra = {}
+        if s not in self.nodes:
+            extra[s] = []
+            for d in self.moves[self.mask[s]]:
+                end, length, _ = self._walk(s, d, stop=t)
+                extra[s].append((end, length, d))
+        if t not in self.nodes:
+            for d in self.moves[self.mask[t]]:
+                end, length, last = self._walk(t, d, stop=s)
+                if end != s or s in self.nodes:
+                    # Reverse edge: from `end` back to t, leaving `end` by the
+                    # opposite of the last move we took to get there
+                    extra.setdefault(end, []).append((t, length, -last))
+
+        def h(node):
+            if not heuristic:
+                return 0
+            y, x = divmod(node, cols)
+            return abs(y - ty) + abs(x - tx)
+
+        dist = {s: 0}
+        parent = {s: None}
+        closed = set()
+        heap = [(h(s), 0, s)]
+        expanded = pushed = 0
+        adj = self.adj
+        while heap:
+            f, g, node = heapq.heappop(heap)
+            if node in closed:
+                continue
+            closed.add(node)
+            expanded += 1
+            if node == t:
+                break
+            edges = adj.get(node, [])
+            if node in extra:
+                edges = edges + extra[node]
+            for nb, length, move in edges:
+                ng = g + length
+                if ng < dist.get(nb, ng + 1):
+                    dist[nb] = ng
+                    parent[nb] = (node, move, length)
+                    pushed += 1
+                    heapq.heappush(heap, (ng + h(nb), ng, nb))
+        if t not in closed:
+            return [], expanded, pushed
+        # Expand the edge chain back into cells
+        cells = []
+        node = t
+        while parent[node] is not None:
+            prev, move, length = parent[node]
+            cells.append(self._cells(prev, move, length))
+            node = prev
+        path = [divmod(s, cols)]
+        for chunk in reversed(cells):
+            path.extend(divmod(c, cols) for c in chunk)
+        return path, expanded, pushed
@@ -0,0 +1,120 @@
+from array import array
+
+from maze_generator import Maze, move_table
+from maze_solver import MazeSolver, DONE
+
+
+class TreeOracle:
+    # Path queries on a perfect maze. The maze is a spanning tree, so the
+    # path between two cells is unique: it runs up from each cell to their
+    # lowest common ancestor (LCA) in the tree rooted at cell 0.
+    #
+    # Each cell stores its parent, depth and one skew-binary jump pointer
+    # (Myers 1983): 12 bytes per cell, built in O(N) in BFS order. Jumps let
+    # an LCA query climb in O(log N) hops; the path itself is read off the
+    # parent array in time proportional to its length.
+    def __init__(self, maze: Maze):
+        cols = maze.cols
+        cells = maze.rows * cols
+        mask = maze.open_mask()
+        moves = move_table(cols)
+        parent = array('i', [-1]) * cells
+        depth = array('i', [0]) * cells
+        jump = array('i', [0]) * cells
+        parent[0] = 0
+        order = array('i', [0])
+        i = 0
+        while i < len(order):
+            cell = order[i]
+            i += 1
+            p = parent[cell]
+            if cell:
+                d = depth[p] + 1
+                depth[cell] = d
+                jp = jump[p]
+                # Skew-binary jumps: if p's jump and its jump's jump span equal
+                # distances, merge them into one jump twice as long
+                if depth[p] - depth[jp] == depth[jp] - depth[jump[jp]]:
+                    jump[cell] = jump[jp]
+                else:
+                    jump[cell] = p
+            for delta in moves[mask[cell]]:
+                nb = cell + delta
+                if nb == p and cell:
+                    continue
+                if parent[nb] >= 0:
+                    raise ValueError("maze has a cycle; TreeOracle needs a perfect maze")
+                parent[nb] = cell
+                order.append(nb)
+        if len(order) != cells:
+            raise ValueError("maze is not connected; TreeOracle needs a perfect maze")
+        self.maze = maze
+        self.cols = cols
+        self.parent = parent
+        self.depth = depth
+        self.jump = jump
+        self.walls_version = maze.walls_version
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.itemsize * len(a) for a in (self.parent, self.depth, self.jump))
+
+    def lca(self, a: int, b: int) -> int:
+        parent, depth, jump = self.parent, self.depth, self.jump
+        if depth[a] < depth[b]:
+            a, b = b, a
+        target = depth[b]
+        while depth[a] > target:
+            a = jump[a] if depth[jump[a]] >= target else parent[a]
+        # Same depth, so a and b have jumps of the same length
+        while a != b:
+            if jump[a] != jump[b]:
+                a, b = jump[a], jump[b]
+            else:
+                a, b = parent[a], parent[b]
+        return a
+
+    def distance(self, start: tuple[int, int], target: tuple[int, int]) -> int:
+        # Number of moves on the path between two (y, x) cells
+        a = start[0] * self.cols + start[1]
+        b = target[0] * self.cols + target[1]
+        depth = self.depth
+        return depth[a] + depth[b] - 2 * depth[self.lca(a, b)]
+
+    def path(self, start: tuple[int, int], target: tuple[int, int]) -> list[tuple[int, int]]:
+        # Cells from start to target inclusive, as MazeSolver returns them
+        cols, parent = self.cols, self.parent
+        a = start[0] * cols + start[1]
+        b = target[0] * cols + target[1]
+        top = self.lca(a, b)
+        up = []
+        while a != top:
+            up.append(divmod(a, cols))
+            a = parent[a]
+        down = []
+        while b != top:
+            down.append(divmod(b, cols))
+            b = parent[b]
+        up.append(divmod(top, cols))
+        down.reverse()
+        return up + down
+
+
+def check_against_bfs(oracle: TreeOracle, pairs) -> list[tuple]:
+    # Runs bfs_steps for each (start, target) pair and returns the pairs on
+    # which the oracle disagrees. The maze's start and target are restored.
+    maze = oracle.maze
+    saved = maze.start, maze.target
+    mismatches = []
+    try:
+        for start, target in pairs:
+            maze.start, maze.target = start, target
+            path = None
+            for step in MazeSolver(maze).bfs_steps():
+                if step[0] == DONE:
+                    path = step[1]
+            if path != oracle.path(start, target) or len(path) - 1 != oracle.distance(start, target):
+                mismatches.append((start, target))
+    finally:
+        maze.start, maze.target = saved
+    return mismatches
@@ -0,0 +1,137 @@
+import os
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+from maze_generator import Maze, move_table
+from maze_io import maze_from_buffer, maze_to_bytes
+from maze_oracle import TreeOracle
+
+
+class BatchResult(NamedTuple):
+    # lengths[i] is the number of moves from pairs[i][0] to pairs[i][1],
+    # or -1 when the target cannot be reached; paths is None unless asked for
+    lengths: array
+    paths: list | None
+
+
+class BatchSolver:
+    # Answers many (start, target) queries on one maze, reusing per-maze
+    # work across queries: a TreeOracle when the maze is perfect, otherwise
+    # a BFS distance field per distinct target, kept in a small LRU cache.
+    # Queries are grouped by target so each field is built once per batch.
+    def __init__(self, maze: Maze, max_fields: int = 64):
+        self.maze = maze
+        self.max_fields = max_fields
+        self._walls_version = None
+
+    def _prepare(self) -> None:
+        maze = self.maze
+        if self._walls_version == maze.walls_version:
+            return
+        self.oracle = TreeOracle(maze) if maze.is_perfect() else None
+        self._fields = OrderedDict()
+        self._walls_version = maze.walls_version
+
+    def distance_field(self, target: int) -> array:
+        # Moves from every cell to `target` (a flat index), -1 if unreachable
+        fields = self._fields
+        if target in fields:
+            fields.move_to_end(target)
+            return fields[target]
+        maze = self.maze
+        cols = maze.cols
+        mask = maze.open_mask()
+        moves = move_table(cols)
+        dist = array('i', [-1]) * (maze.rows * cols)
+        dist[target] = 0
+        queue = deque([target])
+        while queue:
+            cell = queue.popleft()
+            d = dist[cell] + 1
+            for delta in moves[mask[cell]]:
+                if dist[cell + delta] < 0:
+                    dist[cell + delta] = d
+                    queue.append(cell + delta)
+        fields[target] = dist
+        if len(fields) > self.max_fields:
+            fields.popitem(last=False)
+        return dist
+
+    def _field_path(self, dist: array, start: int) -> list[tuple[int, int]]:
+        # Walks downhill in the distance field, preferring N, S, W, E
+        cols = self.maze.cols
+        mask = self.maze.open_mask()
+        moves = move_table(cols)
+        path = [divmod(start, cols)]
+        cell = start
+        while dist[cell]:
+            for delta in moves[mask[cell]]:
+                if dist[cell + delta] == dist[cell] - 1:
+                    cell += delta
+                    break
+            path.append(divmod(cell, cols))
+        return path
+
+    def solve(self, pairs, paths: bool = False) -> BatchResult:
+        self._prepare()
+        pairs = list(pairs)
+        lengths = array('i', [-1]) * len(pairs)
+        found = [None] * len(pairs) if paths else None
+        oracle = self.oracle
+        if oracle is not None:
+            for i, (start, target) in enumerate(pairs):
+                lengths[i] = oracle.distance(start, target)
+                if paths:
+                    found[i] = oracle.path(start, target)
+            return BatchResult(lengths, found)
+        cols = self.maze.cols
+        by_target = {}
+        for i, (start, target) in enumerate(pairs):
+            by_target.setdefault(target[0] * cols + target[1], []).append(i)
+        for target, queries in by_target.items():
+            dist = self.distance_field(target)
+            for i in queries:
+                sy, sx = pairs[i][0]
+                d = dist[sy * cols + sx]
+                lengths[i] = d
+                if paths and d >= 0:
+                    found[i] = self._field_path(dist, sy * cols + sx)
+        return BatchResult(lengths, found)
+
+
+# Each pool worker rebuilds the maze from its serialized form once and then
+# keeps its BatchSolver (and oracle) for every chunk it is handed.
+_worker_solver = None
+
+
+def _init_worker(data: bytes) -> None:
+    global _worker_solver
+    _worker_solver = BatchSolver(maze_from_buffer(data))
+
+
+def _solve_chunk(args) -> BatchResult:
+    pairs, paths = args
+    return _worker_solver.solve(pairs, paths)
+
+
+def solve_batch(maze: Maze, pairs, paths: bool = False, workers: int | None = None,
+                parallel_threshold: int = 200_000, chunk_size: int = 50_000,
+                solver: BatchSolver | None = None) -> BatchResult:
+    # Small batches, or workers == 1, run in this process; larger ones are
+    # split into chunks across a process pool
+    pairs = list(pairs)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(pairs) < parallel_threshold:
+        return (solver or BatchSolver(maze)).solve(pairs, paths)
+    chunks = [(pairs[i:i + chunk_size], paths) for i in range(0, len(pairs), chunk_size)]
+    lengths = array('i')
+    found = [] if paths else None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(maze_to_bytes(maze),)) as pool:
+        for result in pool.map(_solve_chunk, chunks):
+            lengths.extend(result.lengths)
+            if paths:
+                found.extend(result.paths)
+    return BatchResult(lengths, found)
@@ -0,0 +1,153 @@
+import time
+
+import pygame
+
+from maze_solver import MazeSolver, EXPAND, DONE
+
+
+class MazeRace:
+    # Every algorithm of a MazeVisualizer searching the same maze, each in
+    # its own panel. advance(n) moves every unfinished search forward by n
+    # expansions, so the searches stay in lockstep and the counters compare
+    # like with like. All panels share one cached wall layer, and a step
+    # only redraws the pixels it touched, so the cost of a frame grows with
+    # the steps drawn rather than with the number of panels. The searches
+    # run on the UI thread, so each call to advance() stops once BUDGET
+    # seconds are spent, however many steps the speed asks for.
+    COLUMNS = 3
+    HEADER = 20
+    BUDGET = 0.008  # seconds of searching and drawing per frame
+    ROUND = 64  # expansions per search between budget checks
+
+    @classmethod
+    def _panel_size(cls, vis) -> tuple[int, int]:
+        rows = -(-len(vis.ALGORITHMS) // cls.COLUMNS)
+        margin, gap = vis.margin, vis.GAP
+        panel_w = (vis.FIXED_WIDTH - 2 * margin - (cls.COLUMNS - 1) * gap) // cls.COLUMNS
+        panel_h = (vis.FIXED_HEIGHT - 2 * margin - (rows - 1) * gap) // rows - cls.HEADER
+        return panel_w, panel_h
+
+    @classmethod
+    def cell_size_for(cls, vis) -> int:
+        # Pixels per cell in a panel; 0 when the maze does not fit one
+        panel_w, panel_h = cls._panel_size(vis)
+        return min(panel_w // vis.maze.cols, panel_h // vis.maze.rows)
+
+    def __init__(self, visualizer):
+        vis = visualizer
+        self.vis = vis
+        self.algorithms = list(vis.ALGORITHMS)
+        count = len(self.algorithms)
+        gap = vis.GAP
+        panel_w, panel_h = self._panel_size(vis)
+        self.cell_size = self.cell_size_for(vis)
+        if self.cell_size < 1:
+            raise ValueError("the maze does not fit a race panel")
+        self.walls = vis.scaled_walls(self.cell_size)
+        # Top-left corner of the maze in each panel
+        self.origins = []
+        for i in range(count):
+            row, col = divmod(i, self.COLUMNS)
+            self.origins.append((vis.margin + col * (panel_w + gap),
+                                 vis.margin + row * (panel_h + self.HEADER + gap) + self.HEADER))
+        self.panel_width = panel_w
+        solver = MazeSolver(vis.maze)
+        self.runs = [solver.steps(algorithm) for algorithm in self.algorithms]
+        self.expanded = [0] * count
+        self.paths = [None] * count
+        self.finishers = []  # panel indices, fewest expansions first
+
+    @property
+    def finished(self) -> bool:
+        return len(self.finishers) == len(self.runs)
+
+    def _center(self, i, y, x):
+        ox, oy = self.origins[i]
+        half = self.cell_size // 2
+        return (ox + x * self.cell_size + half, oy + y * self.cell_size + half)
+
+    def _panel_rect(self, i):
+        return self.walls.get_rect(topleft=self.origins[i])
+
+    def _draw_header(self, screen, i):
+        ox, oy = self.origins[i]
+        rect = pygame.Rect(ox, oy - self.HEADER, self.panel_width, self.HEADER)
+        screen.fill((255, 255, 255), rect)
+        algorithm = self.algorithms[i]
+        text = f"{algorithm}: {self.expanded[i]}"
+        if self.paths[i] is not None:
+            text += f"  #{self.finishers.index(i) + 1}, path {len(self.paths[i])}"
+        font = self.vis.font
+        screen.blit(font.render(text, True, self.vis.COLORS.get(algorithm, (0, 0, 0))), rect.topleft)
+        return rect
+
+    def draw(self, screen):
+        # Full redraw of every panel above the button row
+        vis = self.vis
+        vis.ensure_layers()
+        screen.blit(vis.background, (0, 0))
+        screen.fill((255, 255, 255), (0, 0, vis.width, vis.button_row_top))
+        cell_size = self.cell_size
+        ty, tx = vis.maze.target
+        for i in range(len(self.runs)):
+            ox, oy = self.origins[i]
+            screen.fill((255, 0, 0), (ox + tx * cell_size, oy + ty * cell_size, cell_size, cell_size))
+            screen.blit(self.walls, self.origins[i])
+            self._draw_header(screen, i)
+        pygame.display.flip()
+
+    def advance(self, screen, steps: int) -> list:
+        # Moves each unfinished search on by up to `steps` expansions and
+        # returns the dirty rectangles. The searches take turns ROUND
+        # expansions at a time, so they stay in lockstep when the budget
+        # cuts a call short.
+        deadline = time.perf_counter() + self.BUDGET
+        dirty = []
+        moved = [i for i in range(len(self.runs)) if self.paths[i] is None]
+        done = 0
+        while done < steps and not self.finished and time.perf_counter() < deadline:
+            n = min(self.ROUND, steps - done)
+            for i in moved:
+                if self.paths[i] is None:
+                    self._advance_one(screen, i, n, dirty)
+            done += n
+        # Searches that ended in the same call are ranked by expansions
+        self.finishers.sort(key=self.expanded.__getitem__)
+        dirty.extend(self._draw_header(screen, i) for i in moved)
+        return dirty
+
+    def _advance_one(self, screen, i, steps, dirty):
+        run = self.runs[i]
+        line_width = max(1, self.cell_size // 3)
+        color = self.vis.COLORS.get(self.algorithms[i], (0, 180, 255))
+        panel = self._panel_rect(i)
+        origin = self.origins[i]
+        taken = 0
+        while taken < steps:
+            step = next(run)
+            if step[0] == EXPAND:
+                taken += 1
+                _, (y, x), parent = step
+                if parent is not None:
+                    rect = pygame.draw.line(screen, color, self._center(i, y, x),
+                                            self._center(i, *parent), line_width)
+                    rect = rect.inflate(2, 2).clip(panel)
+                    screen.blit(self.walls, rect, rect.move(-origin[0], -origin[1]))
+                    dirty.append(rect)
+            elif step[0] == DONE:
+                self.paths[i] = step[1]
+                self.finishers.append(i)
+                self._draw_path(screen, i)
+                dirty.append(panel)
+                break
+        self.expanded[i] += taken
+
+    def _draw_path(self, screen, i):
+        path = self.paths[i]
+        color = self.vis.COLORS.get(f"{self.algorithms[i]}_path", (0, 0, 128))
+        width = max(1, self.cell_size // 2)
+        if len(path) > 1:
+            # One call for the whole path; a line per step takes several
+            # frames' budget on long paths
+            pygame.draw.lines(screen, color, False, [self._center(i, y, x) for y, x in path], width)
+        screen.blit(self.walls, self.origins[i])
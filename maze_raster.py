@@ -0,0 +1,221 @@
+import os
+import struct
+import time
+import zlib
+
+from maze_generator import Maze
+from maze_solver import MazeSolver, SEARCHES, EXPAND, DONE
+
+# Offscreen rendering without pygame.draw: the image is a bytearray with one
+# palette index per pixel, written a whole pixel row or a strided column of
+# cells at a time with slice assignment, and saved as an 8-bit palette PNG.
+#
+# Each cell is cell_size pixels square with walls on its top and left pixel
+# lines, so an image is cols * cell_size + 1 by rows * cell_size + 1 pixels
+# and a cell's interior is (cell_size - 1) pixels square.
+WHITE, WALL, TARGET, VISITED, PATH = range(5)
+PALETTE = [(255, 255, 255), (0, 0, 0), (255, 0, 0), (0, 180, 255), (0, 0, 128)]
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+
+class Raster:
+    # `region` = (y0, x0, rows, cols) draws only that block of cells, as a
+    # tile of a larger view; cell arguments to the methods below are still
+    # maze coordinates. `planes` passes in maze.H.unpack() and
+    # maze.V.unpack() when many tiles are drawn from the same maze.
+    def __init__(self, maze: Maze, cell_size: int = 4, palette=None, region=None, planes=None):
+        if cell_size < 2:
+            raise ValueError("cell_size must be at least 2")
+        y0, x0, rows, cols = region or (0, 0, maze.rows, maze.cols)
+        s = cell_size
+        width = cols * s + 1
+        self.maze = maze
+        self.cell_size = s
+        self.y0, self.x0, self.rows, self.cols = y0, x0, rows, cols
+        self.width = width
+        self.height = rows * s + 1
+        self.palette = list(palette or PALETTE)
+        h, v = planes or (maze.H.unpack(), maze.V.unpack())
+        mcols = maze.cols
+        stride = mcols + 1
+        zeros = bytes(cols + 1)
+        px = bytearray(width * self.height)
+        for y in range(rows + 1):
+            gy = y0 + y
+            row = gy * mcols + x0
+            h_row = h[row:row + cols]
+            # Horizontal walls left and right of each corner on this line
+            h_left = h[row - 1:row + cols] if x0 else b'\0' + h_row
+            h_right = h[row:row + cols + 1] if x0 + cols < mcols else h_row + b'\0'
+            v_up = v[(gy - 1) * stride + x0:(gy - 1) * stride + x0 + cols + 1] if gy else zeros
+            v_down = v[gy * stride + x0:gy * stride + x0 + cols + 1] if gy < maze.rows else zeros
+            # Grid line: wall pixels along each cell edge, and a corner pixel
+            # wherever any of the four walls meeting there is present
+            line = bytearray(width)
+            for k in range(1, s):
+                line[k::s] = h_row
+            corners = (int.from_bytes(h_left, 'little') | int.from_bytes(h_right, 'little')
+                       | int.from_bytes(v_up, 'little') | int.from_bytes(v_down, 'little'))
+            line[::s] = corners.to_bytes(cols + 1, 'little')
+            px[y * s * width:(y * s + 1) * width] = line
+            if y < rows:
+                # The s - 1 pixel rows inside a row of cells are identical
+                line = bytearray(width)
+                line[::s] = v_down
+                start = (y * s + 1) * width
+                px[start:start + (s - 1) * width] = line * (s - 1)
+        self.pixels = px
+        if self.contains(*maze.target):
+            self.fill_cell(*maze.target, TARGET)
+
+    def contains(self, y: int, x: int) -> bool:
+        return self.y0 <= y < self.y0 + self.rows and self.x0 <= x < self.x0 + self.cols
+
+    def fill_cell(self, y: int, x: int, color: int) -> None:
+        s, width, px = self.cell_size, self.width, self.pixels
+        run = bytes([color]) * (s - 1)
+        start = ((y - self.y0) * s + 1) * width + (x - self.x0) * s + 1
+        for r in range(s - 1):
+            px[start + r * width:start + r * width + s - 1] = run
+
+    def fill_cells(self, cells, color: int) -> None:
+        # Colours every cell whose byte in `cells` (one per maze cell, index
+        # y * cols + x, e.g. a solver's closed flags) is non-zero, one cell
+        # row at a time
+        cols, mcols = self.cols, self.maze.cols
+        s, width, px = self.cell_size, self.width, self.pixels
+        keep = bytes(0 if b else 0xFF for b in range(256))
+        paint = bytes(color if b else 0 for b in range(256))
+        for y in range(self.rows):
+            first = (self.y0 + y) * mcols + self.x0
+            row = bytes(cells[first:first + cols])
+            if not any(row):
+                continue
+            start = (y * s + 1) * width
+            line = bytearray(px[start:start + width])
+            new = int.from_bytes(row.translate(paint), 'little')
+            mask = int.from_bytes(row.translate(keep), 'little')
+            for k in range(1, s):
+                old = int.from_bytes(line[k::s], 'little')
+                line[k::s] = (old & mask | new).to_bytes(cols, 'little')
+            px[start:start + (s - 1) * width] = line * (s - 1)
+
+    def draw_path(self, path, color: int = PATH) -> None:
+        # Fills the path's cells and the open wall gaps between them; parts
+        # outside the region are skipped
+        s, width, px = self.cell_size, self.width, self.pixels
+        y0, x0 = self.y0, self.x0
+        run = bytes([color]) * (s - 1)
+        prev = None
+        for y, x in path:
+            if self.contains(y, x):
+                self.fill_cell(y, x, color)
+            if prev is not None:
+                # The gap lies on the wall line of the later of the two cells
+                gy, gx = max(prev, (y, x))
+                if self.contains(gy, gx):
+                    if prev[0] == y:
+                        start = ((gy - y0) * s + 1) * width + (gx - x0) * s
+                        px[start:start + (s - 1) * width:width] = run
+                    else:
+                        start = (gy - y0) * s * width + (gx - x0) * s + 1
+                        px[start:start + s - 1] = run
+            prev = (y, x)
+
+    def png(self, level: int = 6) -> bytes:
+        width, px = self.width, self.pixels
+        # Every scanline starts with filter type 0 (none)
+        raw = b''.join(b'\0' + px[i:i + width] for i in range(0, len(px), width))
+        header = struct.pack('>IIBBBBB', width, self.height, 8, 3, 0, 0, 0)
+        return b''.join((b'\x89PNG\r\n\x1a\n', _png_chunk(b'IHDR', header),
+                         _png_chunk(b'PLTE', bytes(c for rgb in self.palette for c in rgb)),
+                         _png_chunk(b'IDAT', zlib.compress(raw, level)), _png_chunk(b'IEND', b'')))
+
+    def save(self, path, level: int = 6) -> None:
+        with open(path, 'wb') as f:
+            f.write(self.png(level))
+
+    def to_surface(self):
+        # An 8-bit pygame Surface over a copy of the pixels, for blitting
+        import pygame
+        surface = pygame.image.frombuffer(bytes(self.pixels), (self.width, self.height), 'P')
+        surface.set_palette(self.palette)
+        return surface
+
+
+def save_image(maze: Maze, path, cell_size: int = 4, algorithm: str | None = None, level: int = 6) -> Raster:
+    # Still image of the maze; with an algorithm, also the cells its search
+    # expanded and the path it found
+    raster = Raster(maze, cell_size)
+    if algorithm is not None:
+        cols = maze.cols
+        closed = bytearray(maze.rows * cols)
+        path_cells = []
+        for step in MazeSolver(maze).steps(algorithm):
+            if step[0] == EXPAND:
+                y, x = step[1]
+                closed[y * cols + x] = 1
+            elif step[0] == DONE:
+                path_cells = step[1]
+        raster.fill_cells(closed, VISITED)
+        raster.draw_path(path_cells)
+        raster.fill_cell(*maze.target, TARGET)
+    raster.save(path, level)
+    return raster
+
+
+def export_frames(maze: Maze, algorithm: str, directory, cell_size: int = 4, every: int = 1000,
+                  level: int = 1) -> dict:
+    # Writes frame_00000.png, ... to `directory`: one frame per `every`
+    # expansions of the search, then one with the path. Returns the frame
+    # count and frames per second, PNG encoding included.
+    os.makedirs(directory, exist_ok=True)
+    start = time.perf_counter()
+    raster = Raster(maze, cell_size)
+    frames = 0
+
+    def write():
+        nonlocal frames
+        raster.save(os.path.join(directory, f"frame_{frames:05d}.png"), level)
+        frames += 1
+
+    expanded = 0
+    for step in MazeSolver(maze).steps(algorithm):
+        if step[0] == EXPAND:
+            y, x = step[1]
+            if (y, x) != maze.target:
+                raster.fill_cell(y, x, VISITED)
+            expanded += 1
+            if expanded % every == 0:
+                write()
+        elif step[0] == DONE:
+            raster.draw_path(step[1])
+            raster.fill_cell(*maze.target, TARGET)
+            write()
+    elapsed = time.perf_counter() - start
+    return {"frames": frames, "seconds": elapsed, "fps": frames / elapsed if elapsed else 0.0}
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--generator", choices=Maze.ALGORITHMS, default="dfs")
+    parser.add_argument("--algorithm", choices=list(SEARCHES), default=None,
+                        help="also draw this search's expanded cells and path")
+    parser.add_argument("--cell-size", type=int, default=4)
+    parser.add_argument("--output", "-o", default="maze.png")
+    parser.add_argument("--frames", metavar="DIR", default=None,
+                        help="write a PNG frame sequence of the search to DIR instead")
+    parser.add_argument("--every", type=int, default=1000, help="expansions per frame")
+
+
+def main(args) -> None:
+    maze = Maze.generated(args.size, args.size, args.generator, args.seed)
+    if args.frames is None:
+        save_image(maze, args.output, args.cell_size, args.algorithm)
+        return
+    r = export_frames(maze, args.algorithm or "astar", args.frames, args.cell_size, args.every)
+    print(f"{r['frames']} frames in {r['seconds']:.2f}s ({r['fps']:.1f} fps)")
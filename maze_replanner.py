@@ -0,0 +1,163 @@
+import heapq
+from array import array
+from typing import NamedTuple
+
+from maze_generator import Maze, move_table
+from maze_solver import MazeSolver
+
+INF = 1 << 40
+
+
+class ReplanResult(NamedTuple):
+    # expanded counts this plan() call only; reexpanded is how many of those
+    # expansions hit a cell some earlier expansion had already handled.
+    # fresh_expanded is what a from-scratch A* expands on the same maze,
+    # when plan() is asked to compare.
+    path: list
+    expanded: int
+    reexpanded: int
+    fresh_expanded: int | None
+
+
+class IncrementalPlanner:
+    # D* Lite (Koenig & Likhachev 2002) over the maze cells. The search runs
+    # backwards from the target, so g[cell] is the distance from cell to the
+    # target and the start only enters through the heuristic. Edits go
+    # through this class: set_wall() re-evaluates the two cells on either
+    # side of the wall, move_start() shifts the heuristic by the km offset
+    # instead of re-keying the queue, and move_target() treats the target as
+    # the one cell joined to a virtual root, so moving it is just two more
+    # edge changes. plan() then repairs the previous search, expanding only
+    # cells whose distance the edit can have changed.
+    #
+    # Keys are integers (k1 * (cells + 1) + k2) and heap entries are
+    # key * cells + cell, as in MazeSolver. A cell's live key is kept in
+    # `queued`; heap entries that no longer match it are skipped when popped.
+    # Walls changed behind the planner's back (maze.version moving without
+    # it) make the next plan() start over.
+    def __init__(self, maze: Maze):
+        self.maze = maze
+        self._reset()
+
+    def _reset(self) -> None:
+        maze = self.maze
+        cols = maze.cols
+        cells = maze.rows * cols
+        self.cols = cols
+        self.cells = cells
+        self.mask = maze.open_mask()
+        self.moves = move_table(cols)
+        self.g = array('q', [INF]) * cells
+        self.rhs = array('q', [INF]) * cells
+        self.queued = array('q', [-1]) * cells
+        self.seen = bytearray(cells)
+        self.heap = []
+        self.km = 0
+        self.start = maze.start[0] * cols + maze.start[1]
+        self.target = maze.target[0] * cols + maze.target[1]
+        self.rhs[self.target] = 0
+        self._update(self.target)
+        self.version = maze.version
+
+    def _sync(self) -> None:
+        if self.maze.version != self.version or self.maze.open_mask() is not self.mask:
+            self._reset()
+
+    def _key(self, cell: int) -> int:
+        m = min(self.g[cell], self.rhs[cell])
+        y, x = divmod(cell, self.cols)
+        sy, sx = divmod(self.start, self.cols)
+        return (m + abs(y - sy) + abs(x - sx) + self.km) * (self.cells + 1) + m
+
+    def _update(self, cell: int) -> None:
+        g, rhs = self.g, self.rhs
+        if cell != self.target:
+            best = INF
+            for d in self.moves[self.mask[cell]]:
+                if g[cell + d] + 1 < best:
+                    best = g[cell + d] + 1
+            rhs[cell] = best
+        if g[cell] != rhs[cell]:
+            key = self._key(cell)
+            self.queued[cell] = key
+            heapq.heappush(self.heap, key * self.cells + cell)
+        else:
+            self.queued[cell] = -1
+
+    def _compute(self) -> tuple[int, int]:
+        g, rhs, queued, seen = self.g, self.rhs, self.queued, self.seen
+        heap, cells, moves, mask = self.heap, self.cells, self.moves, self.mask
+        start = self.start
+        expanded = reexpanded = 0
+        while heap:
+            key, cell = divmod(heap[0], cells)
+            if queued[cell] != key:
+                heapq.heappop(heap)
+                continue
+            if key >= self._key(start) and g[start] == rhs[start]:
+                break
+            heapq.heappop(heap)
+            new_key = self._key(cell)
+            if key < new_key:
+                # Stale after a start move raised km; requeue with the new key
+                queued[cell] = new_key
+                heapq.heappush(heap, new_key * cells + cell)
+                continue
+            queued[cell] = -1
+            expanded += 1
+            if seen[cell]:
+                reexpanded += 1
+            seen[cell] = 1
+            if g[cell] > rhs[cell]:
+                g[cell] = rhs[cell]
+            else:
+                g[cell] = INF
+                self._update(cell)
+            for d in moves[mask[cell]]:
+                self._update(cell + d)
+        return expanded, reexpanded
+
+    def _path(self) -> list[tuple[int, int]]:
+        # Greedy descent of g from the start
+        g, cols, moves, mask = self.g, self.cols, self.moves, self.mask
+        cell = self.start
+        if g[cell] >= INF:
+            return []
+        path = [divmod(cell, cols)]
+        while cell != self.target:
+            cell = min((cell + d for d in moves[mask[cell]]), key=g.__getitem__)
+            path.append(divmod(cell, cols))
+        return path
+
+    def plan(self, compare: bool = False) -> ReplanResult:
+        self._sync()
+        expanded, reexpanded = self._compute()
+        fresh = MazeSolver(self.maze).solve("astar").expanded if compare else None
+        return ReplanResult(self._path(), expanded, reexpanded, fresh)
+
+    def set_wall(self, a: tuple[int, int], b: tuple[int, int], wall: bool) -> None:
+        self._sync()
+        self.maze.set_wall(a, b, wall)
+        self.version = self.maze.version
+        cols = self.cols
+        self._update(a[0] * cols + a[1])
+        self._update(b[0] * cols + b[1])
+
+    def move_start(self, start: tuple[int, int]) -> None:
+        self._sync()
+        cols = self.cols
+        old_y, old_x = divmod(self.start, cols)
+        self.km += abs(start[0] - old_y) + abs(start[1] - old_x)
+        self.start = start[0] * cols + start[1]
+        self.maze.set_endpoints(start=start)
+        self.version = self.maze.version
+
+    def move_target(self, target: tuple[int, int]) -> None:
+        self._sync()
+        old = self.target
+        self.target = target[0] * self.cols + target[1]
+        self.maze.set_endpoints(target=target)
+        self.version = self.maze.version
+        self.rhs[self.target] = 0
+        self._update(old)
+        self._update(self.target)
@@ -1,161 +1,462 @@
 import heapq
+import time
+from array import array
 from collections import deque
+from functools import partial
+from itertools import repeat
+from typing import NamedTuple
+
+from maze_generator import OPEN_N, OPEN_S, OPEN_W, OPEN_E, POPCOUNT, move_table
+
+# Step events yielded by the *_steps generators:
+#   (EXPAND, (y, x), parent)  a cell was taken off the frontier
+#   (PUSH, (y, x), parent)    a cell was added to (or improved in) the frontier
+#   (DONE, path)              search finished; path runs start -> target
+# parent is the (y, x) the cell was reached from, or None for the start.
+EXPAND = 'expand'
+PUSH = 'push'
+DONE = 'done'
+
+# All five searches share one loop. The frontier is a FIFO queue, a LIFO
+# stack or a heap; heap entries are integer keys built by the algorithm's
+# priority function key(cell, g) as rank * cells + cell, so ties on rank
+# fall back to the cell index, i.e. (y, x) order. "Relaxing" searches
+# (Dijkstra, A*) may improve a cell already on the frontier; the others
+# settle a cell the first time it is pushed.
+FIFO = 'fifo'
+LIFO = 'lifo'
+HEAP = 'heap'
+
+def _dijkstra_key(cols, cells, ty, tx):
+    return lambda cell, g: g * cells + cell
+
+def _astar_key(cols, cells, ty, tx):
+    def key(cell, g):
+        y, x = divmod(cell, cols)
+        return ((g + abs(y - ty) + abs(x - tx)) * cells + g) * cells + cell
+    return key
+
+def _greedy_key(cols, cells, ty, tx):
+    def key(cell, g):
+        y, x = divmod(cell, cols)
+        return (abs(y - ty) + abs(x - tx)) * cells + cell
+    return key
+
+# algorithm: (frontier, priority function factory, relax)
+SEARCHES = {
+    "dijkstra": (HEAP, _dijkstra_key, True),
+    "astar": (HEAP, _astar_key, True),
+    "bfs": (FIFO, None, False),
+    "dfs": (LIFO, None, False),
+    "greedy_best_first": (HEAP, _greedy_key, False),
+}
+
+# Display names used by the visualizer
+ALGORITHM_NAMES = {
+    "A*": "astar",
+    "Dijkstra": "dijkstra",
+    "Breadth-First Search": "bfs",
+    "Depth-First Search": "dfs",
+    "Greedy Best First": "greedy_best_first",
+}
+
+
+class SolverMetrics(NamedTuple):
+    expanded: int
+    neighbors_scanned: int
+    pushes: int
+    stale_pops: int
+    peak_frontier: int
+    path_length: int
+    search_s: float
+    path_s: float
+
+
+class SolveResult(NamedTuple):
+    algorithm: str
+    path: list
+    expanded: int
+    pushed: int
+    metrics: SolverMetrics | None = None
+
+
+# bytes.translate table used when metrics are collected
+_SELECT = bytes(0xFF if b else 0 for b in range(256))
+
+# For A* and greedy, solve() splits a cell's moves into those that bring
+# it closer to the target (the heuristic drops by 1) and those that take
+# it away. The index is open mask << 4 | the OPEN_* directions that point
+# towards the target.
+_DIRECTIONS = (OPEN_N, OPEN_S, OPEN_W, OPEN_E)
+
+
+def _split_moves(cols: int) -> list:
+    offsets = dict(zip(_DIRECTIONS, (-cols, cols, -1, 1)))
+    return [(tuple(offsets[b] for b in _DIRECTIONS if m & b and t & b),
+             tuple(offsets[b] for b in _DIRECTIONS if m & b and not t & b))
+            for m in range(16) for t in range(16)]
+
 
 class MazeSolver:
     def __init__(self, maze):
         self.maze = maze
+        self._batch = None
+        self._junctions = None
+        # ((maze.walls_version, maze.target), mask << 4 | towards-target bits
+        # per cell), see _towards()
+        self._towards_cache = None
+        # Metrics of the last instrumented solve() or steps() run
+        self.last_metrics = None
 
-    def dijkstra_steps(self):
-        sy, sx = self.maze.start
-        ty, tx = self.maze.target
-        dist = [[float('inf') for _ in range(self.maze.cols)] for _ in range(self.maze.rows)]
+    def solve_batch(self, pairs, paths: bool = False, workers: int | None = None):
+        # Path lengths (and optionally paths) for many (start, target) pairs
+        # on this maze; see maze_queries.solve_batch
+        from maze_queries import BatchSolver, solve_batch
+        if self._batch is None:
+            self._batch = BatchSolver(self.maze)
+        return solve_batch(self.maze, pairs, paths=paths, workers=workers, solver=self._batch)
+
+    def legacy_steps(self, steps):
+        # Replays an event stream in the old (y, x, prev_grid_copy) /
+        # ('done', path, prev) format. Costs O(rows * cols) per expansion.
         prev = [[None for _ in range(self.maze.cols)] for _ in range(self.maze.rows)]
-        dist[sy][sx] = 0
-        heap = [(0, sy, sx)]
-        visited = set()
-        while heap:
-            d, y, x = heapq.heappop(heap)
-            if (y, x) in visited:
-                continue
-            visited.add((y, x))
-            yield (y, x, [row[:] for row in prev])
-            if (y, x) == (ty, tx):
-                break
-            for ny, nx in self.maze.neighbors(y, x):
-                if dist[ny][nx] > d + 1:
-                    dist[ny][nx] = d + 1
-                    prev[ny][nx] = (y, x)
-                    heapq.heappush(heap, (dist[ny][nx], ny, nx))
-        path = []
-        cy, cx = ty, tx
-        while (cy, cx) != (sy, sx):
-            path.append((cy, cx))
-            cy, cx = prev[cy][cx]
-            if cy is None or cx is None:
-                return []
-        path.append((sy, sx))
+        for step in steps:
+            if step[0] == PUSH:
+                (y, x), parent = step[1], step[2]
+                prev[y][x] = parent
+            elif step[0] == EXPAND:
+                y, x = step[1]
+                yield (y, x, [row[:] for row in prev])
+            elif step[0] == DONE:
+                yield ('done', step[1], prev)
+
+    def _setup(self, algorithm: str):
+        algorithm = ALGORITHM_NAMES.get(algorithm, algorithm)
+        if algorithm not in SEARCHES:
+            raise ValueError(f"unknown algorithm {algorithm!r}")
+        frontier, make_key, relax = SEARCHES[algorithm]
+        maze = self.maze
+        cols = maze.cols
+        cells = maze.rows * cols
+        ty, tx = maze.target
+        sy, sx = maze.start
+        start = sy * cols + sx
+        key = make_key(cols, cells, ty, tx) if make_key else None
+        if frontier == HEAP:
+            queue = [key(start, 0)]
+            put = partial(heapq.heappush, queue)
+            take = partial(heapq.heappop, queue)
+        else:
+            queue = deque([start])
+            put = queue.append
+            take = queue.popleft if frontier == FIFO else queue.pop
+        moves = move_table(cols)
+        # Per-cell arrays: parent index, cost from start (cells == not yet
+        # reached) and a closed flag. Non-relaxing searches never need the
+        # cost, so they add 0 per move and the first push of a cell wins.
+        parent = array('i', [-1]) * cells
+        dist = array('i', [cells]) * cells
+        dist[start] = 0
+        closed = bytearray(cells)
+        return (algorithm, key, queue, put, take, 1 if relax else 0, maze.open_mask(), moves,
+                parent, dist, closed, cols, cells, start, ty * cols + tx)
+
+    @staticmethod
+    def _instrument(queue, put):
+        # Wraps put() to count pushes and track the largest frontier. Only
+        # used when metrics are requested, so plain runs keep the bare
+        # C-level put.
+        counts = [len(queue), 0]  # peak frontier, pushes
+
+        def counting_put(item):
+            put(item)
+            counts[1] += 1
+            if len(queue) > counts[0]:
+                counts[0] = len(queue)
+        return counting_put, counts
+
+    @staticmethod
+    def _metrics(queue, mask, closed, target, pushes, peak, path, search_s, path_s) -> SolverMetrics:
+        # Counts that follow from the final state are derived here instead
+        # of being tallied in the loop: every push but those still queued
+        # was popped, pops that found a closed cell were stale, and each
+        # expanded cell except the target scanned all of its open neighbours.
+        cells = len(closed)
+        expanded = sum(closed)
+        pops = pushes + 1 - len(queue)
+        degrees = int.from_bytes(mask.translate(POPCOUNT), 'little')
+        selected = int.from_bytes(closed.translate(_SELECT), 'little')
+        scanned = sum((degrees & selected).to_bytes(cells, 'little'))
+        if closed[target]:
+            scanned -= POPCOUNT[mask[target]]
+        return SolverMetrics(expanded, scanned, pushes, pops - expanded, peak,
+                             len(path), search_s, path_s)
+
+    @staticmethod
+    def _path(parent, start: int, target: int, cols: int) -> list[tuple[int, int]]:
+        path = [target]
+        append = path.append
+        cell = target
+        while cell != start:
+            cell = parent[cell]
+            append(cell)
         path.reverse()
-        yield ('done', path, prev)
+        return list(map(divmod, path, repeat(cols)))
 
-    def astar_steps(self):
-        sy, sx = self.maze.start
-        ty, tx = self.maze.target
-        def heuristic(y, x):
-            return abs(y - ty) + abs(x - tx)
-        dist = [[float('inf') for _ in range(self.maze.cols)] for _ in range(self.maze.rows)]
-        prev = [[None for _ in range(self.maze.cols)] for _ in range(self.maze.rows)]
-        dist[sy][sx] = 0
-        heap = [(heuristic(sy, sx), 0, sy, sx)]
-        visited = set()
-        while heap:
-            f, d, y, x = heapq.heappop(heap)
-            if (y, x) in visited:
+    def solve(self, algorithm: str, contract: bool = False, metrics: bool = False) -> SolveResult:
+        # Runs the whole search in one call, without per-step events.
+        # contract=True runs Dijkstra or A* on the corridor-contracted
+        # junction graph instead; expanded then counts junctions.
+        # metrics=True also fills in SolveResult.metrics; the contracted
+        # search has no per-cell counts, so the two cannot be combined.
+        #
+        # The shared loop in steps() defines the order in which each search
+        # expands cells. Run in one call, that loop is still held back by
+        # the generic frontier: every push goes through a key function and
+        # a heap, and every pop through a closed check, which keeps it well
+        # short of the 10x speedup over the old generators that solve() is
+        # for. So solve() runs a loop specialised to the frontier instead. It
+        # expands cells in exactly the shared loop's order, so results and
+        # counts are the same; tests/test_solver.py checks the two against
+        # each other for every algorithm.
+        # - BFS and DFS: a plain queue or stack; a cell is queued at most
+        #   once, so the parent array doubles as the visited set.
+        # - Dijkstra: every move costs 1, so the heap only ever holds two
+        #   distances; each distance is a list, sorted by cell when reached.
+        # - A* and greedy: one heap per priority level, keyed by g * cells
+        #   + cell for A* and by cell for greedy. The Manhattan heuristic
+        #   changes by exactly 1 per move, so a move either keeps the
+        #   level (A*) or drops it by one (greedy), or goes one level up.
+        # With metrics, each expansion also adds its neighbours to the scan
+        # count and checks the frontier size; without, that is a single
+        # untaken branch per expansion.
+        if contract:
+            if metrics:
+                raise ValueError("metrics are not collected with contract=True")
+            return self._solve_contracted(algorithm)
+        algorithm = ALGORITHM_NAMES.get(algorithm, algorithm)
+        if algorithm not in SEARCHES:
+            raise ValueError(f"unknown algorithm {algorithm!r}")
+        started = time.perf_counter() if metrics else 0.0
+        maze = self.maze
+        cols = maze.cols
+        cells = maze.rows * cols
+        sy, sx = maze.start
+        ty, tx = maze.target
+        start = sy * cols + sx
+        target = ty * cols + tx
+        mask = maze.open_mask()
+        parent = array('i', [-1]) * cells
+        if algorithm in ("astar", "greedy_best_first"):
+            expanded, pushed, found, counts = self._solve_levels(
+                algorithm == "astar", start, target, abs(sy - ty) + abs(sx - tx), parent, cells,
+                metrics)
+        else:
+            moves = move_table(cols)
+            # parent[start] marks the start as reached; _path() stops there
+            parent[start] = start
+            expanded = scanned = 0
+            peak = 1
+            found = False
+            if algorithm == "dijkstra":
+                level = [start]
+                while level and not found:
+                    level.sort()
+                    queue = []
+                    put = queue.append
+                    # Frontier: what is left of this level plus the next one
+                    left = len(level) + expanded
+                    for cell in level:
+                        expanded += 1
+                        if cell == target:
+                            found = True
+                            break
+                        nbs = moves[mask[cell]]
+                        for d in nbs:
+                            nb = cell + d
+                            if parent[nb] < 0:
+                                parent[nb] = cell
+                                put(nb)
+                        if metrics:
+                            scanned += len(nbs)
+                            if left - expanded + len(queue) > peak:
+                                peak = left - expanded + len(queue)
+                    level = queue
+            else:
+                queue = deque([start]) if algorithm == "bfs" else [start]
+                put = queue.append
+                take = queue.popleft if algorithm == "bfs" else queue.pop
+                while queue:
+                    cell = take()
+                    expanded += 1
+                    if cell == target:
+                        found = True
+                        break
+                    nbs = moves[mask[cell]]
+                    for d in nbs:
+                        nb = cell + d
+                        if parent[nb] < 0:
+                            parent[nb] = cell
+                            put(nb)
+                    if metrics:
+                        scanned += len(nbs)
+                        if len(queue) > peak:
+                            peak = len(queue)
+            # Every cell reached but the start was pushed exactly once, and
+            # so popped at most once: these frontiers never hold stale entries
+            pushed = cells - parent.count(-1) - 1
+            counts = (scanned, 0, peak)
+        if not metrics:
+            path = self._path(parent, start, target, cols) if found else []
+            return SolveResult(algorithm, path, expanded, pushed)
+        searched = time.perf_counter()
+        path = self._path(parent, start, target, cols) if found else []
+        scanned, stale, peak = counts
+        self.last_metrics = SolverMetrics(expanded, scanned, pushed, stale, peak, len(path),
+                                          searched - started, time.perf_counter() - searched)
+        return SolveResult(algorithm, path, expanded, pushed, self.last_metrics)
+
+    def _solve_levels(self, astar: bool, start: int, target: int, h: int, parent, cells: int,
+                      metrics: bool = False):
+        # A* level l holds f = h(start) + 2 * l; greedy level l holds h = l.
+        # Returns expanded, pushed, found and (scanned, stale pops, peak
+        # frontier), the last counted only with metrics.
+        moves = _split_moves(self.maze.cols)
+        towards = self._towards()
+        dist = array('i', [cells]) * cells
+        dist[start] = 0
+        closed = bytearray(cells)
+        step, scale, near = (1, cells, 0) if astar else (0, 0, -1)
+        low = 0 if astar else h
+        levels = [[] for _ in range(low + 2)]
+        levels[low].append(start)
+        push, pop = heapq.heappush, heapq.heappop
+        expanded = pushed = stale = scanned = 0
+        peak = 1
+        while low < len(levels):
+            level = levels[low]
+            if not level:
+                low += 1
                 continue
-            visited.add((y, x))
-            yield (y, x, [row[:] for row in prev])
-            if (y, x) == (ty, tx):
-                break
-            for ny, nx in self.maze.neighbors(y, x):
-                if dist[ny][nx] > d + 1:
-                    dist[ny][nx] = d + 1
-                    prev[ny][nx] = (y, x)
-                    heapq.heappush(heap, (dist[ny][nx] + heuristic(ny, nx), dist[ny][nx], ny, nx))
-        path = []
-        cy, cx = ty, tx
-        while (cy, cx) != (sy, sx):
-            path.append((cy, cx))
-            cy, cx = prev[cy][cx]
-            if cy is None or cx is None:
-                return []
-        path.append((sy, sx))
-        path.reverse()
-        yield ('done', path, prev)
+            cell = pop(level) % cells
+            if closed[cell]:
+                stale += 1
+                continue
+            closed[cell] = 1
+            expanded += 1
+            if cell == target:
+                return expanded, pushed, True, (scanned, stale, peak)
+            g = dist[cell] + step
+            base = g * scale
+            closer, away = moves[towards[cell]]
+            if away:
+                if low + 1 == len(levels):
+                    levels.append([])
+                level = levels[low + 1]
+                for d in away:
+                    nb = cell + d
+                    if g < dist[nb]:
+                        dist[nb] = g
+                        parent[nb] = cell
+                        pushed += 1
+                        push(level, base + nb)
+            if closer:
+                level = levels[low + near]
+                for d in closer:
+                    nb = cell + d
+                    if g < dist[nb]:
+                        dist[nb] = g
+                        parent[nb] = cell
+                        pushed += 1
+                        push(level, base + nb)
+                if level:
+                    low += near
+            if metrics:
+                scanned += len(closer) + len(away)
+                # Every push not yet popped is still on some level
+                if pushed + 1 - expanded - stale > peak:
+                    peak = pushed + 1 - expanded - stale
+        return expanded, pushed, False, (scanned, stale, peak)
 
-    def bfs_steps(self):
-        sy, sx = self.maze.start
-        ty, tx = self.maze.target
-        visited = [[False for _ in range(self.maze.cols)] for _ in range(self.maze.rows)]
-        prev = [[None for _ in range(self.maze.cols)] for _ in range(self.maze.rows)]
-        queue = deque()
-        queue.append((sy, sx))
-        visited[sy][sx] = True
+    def _towards(self) -> bytes:
+        # One byte per cell: open mask << 4 | the directions towards the
+        # target, built a row pattern at a time and cached until the walls
+        # or the target change
+        maze = self.maze
+        key = (maze.walls_version, maze.target)
+        cached = self._towards_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        rows, cols = maze.rows, maze.cols
+        ty, tx = maze.target
+        across = bytes(OPEN_W if x > tx else OPEN_E if x < tx else 0 for x in range(cols))
+        patterns = [across.translate(bytes((b | bit) & 0xFF for b in range(256)))
+                    for bit in (OPEN_S, 0, OPEN_N)]
+        towards = b''.join((patterns[0] * ty, patterns[1], patterns[2] * (rows - ty - 1)))
+        mask = maze.open_mask()
+        towards = (int.from_bytes(mask, 'little') << 4
+                   | int.from_bytes(towards, 'little')).to_bytes(rows * cols, 'little')
+        self._towards_cache = (key, towards)
+        return towards
+
+    def _solve_contracted(self, algorithm: str) -> SolveResult:
+        from maze_junctions import JunctionGraph
+        algorithm = ALGORITHM_NAMES.get(algorithm, algorithm)
+        if algorithm not in ("dijkstra", "astar"):
+            raise ValueError(f"contract=True needs 'dijkstra' or 'astar', not {algorithm!r}")
+        if self._junctions is None or self._junctions.walls_version != self.maze.walls_version:
+            self._junctions = JunctionGraph(self.maze)
+        path, expanded, pushed = self._junctions.search(self.maze.start, self.maze.target,
+                                                        heuristic=algorithm == "astar")
+        return SolveResult(algorithm, path, expanded, pushed)
+
+    def steps(self, algorithm: str, metrics: bool = False):
+        # Same search as solve(), yielding EXPAND / PUSH / DONE events.
+        # With metrics=True, last_metrics is set just before DONE; its
+        # search time includes time spent by the consumer between steps.
+        (algorithm, key, queue, put, take, step, mask, moves,
+         parent, dist, closed, cols, cells, start, target) = self._setup(algorithm)
+        if metrics:
+            put, peak = self._instrument(queue, put)
+            started = time.perf_counter()
         while queue:
-            y, x = queue.popleft()
-            yield (y, x, [row[:] for row in prev])
-            if (y, x) == (ty, tx):
+            cell = take() % cells
+            if closed[cell]:
+                continue
+            closed[cell] = 1
+            p = parent[cell]
+            yx = divmod(cell, cols)
+            yield (EXPAND, yx, divmod(p, cols) if p >= 0 else None)
+            if cell == target:
                 break
-            for ny, nx in self.maze.neighbors(y, x):
-                if not visited[ny][nx]:
-                    visited[ny][nx] = True
-                    prev[ny][nx] = (y, x)
-                    queue.append((ny, nx))
-        path = []
-        cy, cx = ty, tx
-        while (cy, cx) != (sy, sx):
-            path.append((cy, cx))
-            cy, cx = prev[cy][cx]
-            if cy is None or cx is None:
-                return []
-        path.append((sy, sx))
-        path.reverse()
-        yield ('done', path, prev)
+            g = dist[cell] + step
+            for d in moves[mask[cell]]:
+                nb = cell + d
+                if g < dist[nb]:
+                    dist[nb] = g
+                    parent[nb] = cell
+                    put(nb if key is None else key(nb, g))
+                    yield (PUSH, divmod(nb, cols), yx)
+        if not metrics:
+            yield (DONE, self._path(parent, start, target, cols) if closed[target] else [])
+            return
+        searched = time.perf_counter()
+        path = self._path(parent, start, target, cols) if closed[target] else []
+        self.last_metrics = self._metrics(queue, mask, closed, target, peak[1], peak[0], path,
+                                          searched - started, time.perf_counter() - searched)
+        yield (DONE, path)
+
+    def dijkstra_steps(self):
+        return self.steps("dijkstra")
+
+    def astar_steps(self):
+        return self.steps("astar")
+
+    def bfs_steps(self):
+        return self.steps("bfs")
 
     def dfs_steps(self):
-        sy, sx = self.maze.start
-        ty, tx = self.maze.target
-        stack = [(sy, sx)]
-        visited = [[False for _ in range(self.maze.cols)] for _ in range(self.maze.rows)]
-        prev = [[None for _ in range(self.maze.cols)] for _ in range(self.maze.rows)]
-        visited[sy][sx] = True
-        while stack:
-            y, x = stack.pop()
-            yield (y, x, [row[:] for row in prev])
-            if (y, x) == (ty, tx):
-                break
-            for ny, nx in self.maze.neighbors(y, x):
-                if not visited[ny][nx]:
-                    visited[ny][nx] = True
-                    prev[ny][nx] = (y, x)
-                    stack.append((ny, nx))
-        # Final path
-        path = []
-        cy, cx = ty, tx
-        while (cy, cx) != (sy, sx):
-            path.append((cy, cx))
-            cy, cx = prev[cy][cx]
-            if cy is None or cx is None:
-                return []
-        path.append((sy, sx))
-        path.reverse()
-        yield ('done', path, prev)
+        return self.steps("dfs")
 
     def greedy_best_first_steps(self):
-        sy, sx = self.maze.start
-        ty, tx = self.maze.target
-        def heuristic(y, x):
-            return abs(y - ty) + abs(x - tx)
-        heap = [(heuristic(sy, sx), sy, sx)]
-        visited = [[False for _ in range(self.maze.cols)] for _ in range(self.maze.rows)]
-        prev = [[None for _ in range(self.maze.cols)] for _ in range(self.maze.rows)]
-        visited[sy][sx] = True
-        while heap:
-            h, y, x = heapq.heappop(heap)
-            yield (y, x, [row[:] for row in prev])
-            if (y, x) == (ty, tx):
-                break
-            for ny, nx in self.maze.neighbors(y, x):
-                if not visited[ny][nx]:
-                    visited[ny][nx] = True
-                    prev[ny][nx] = (y, x)
-                    heapq.heappush(heap, (heuristic(ny, nx), ny, nx))
-        # Final path
-        path = []
-        cy, cx = ty, tx
-        while (cy, cx) != (sy, sx):
-            path.append((cy, cx))
-            cy, cx = prev[cy][cx]
-            if cy is None or cx is None:
-                return []
-        path.append((sy, sx))
-        path.reverse()
-        yield ('done', path, prev)
+        return self.steps("greedy_best_first")
@@ -0,0 +1,136 @@
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+from bit_grid import BitGrid
+
+# Tiled generation: the grid is cut into rectangular tiles, each tile is
+# carved into its own spanning tree by a worker process, and the tiles are
+# then joined along a random spanning tree of the tile grid by opening
+# exactly one seam wall per tree edge. A tree of trees joined by single
+# edges is again a spanning tree, so the result is a perfect maze.
+#
+# During carving the walls live in one shared-memory block with a byte per
+# wall (1 = wall): the H plane ((rows + 1) x cols) followed by the V plane
+# (rows x (cols + 1)). Workers only write walls strictly inside their own
+# tile, so no two processes ever touch the same byte. The planes are packed
+# into BitGrids at the end.
+
+
+def _carve(buf, rows: int, cols: int, y0: int, y1: int, x0: int, x1: int, rng) -> None:
+    h, w = y1 - y0, x1 - x0
+    v_offset = (rows + 1) * cols
+    stride = cols + 1
+    visited = bytearray(h * w)
+    cell = rng.randrange(h * w)
+    visited[cell] = 1
+    stack = [cell]
+    while stack:
+        cell = stack[-1]
+        ly, lx = divmod(cell, w)
+        y, x = y0 + ly, x0 + lx
+        # (neighbor, index of the wall between us in buf)
+        neighbors = []
+        if ly > 0 and not visited[cell - w]:
+            neighbors.append((cell - w, y * cols + x))
+        if ly < h - 1 and not visited[cell + w]:
+            neighbors.append((cell + w, (y + 1) * cols + x))
+        if lx > 0 and not visited[cell - 1]:
+            neighbors.append((cell - 1, v_offset + y * stride + x))
+        if lx < w - 1 and not visited[cell + 1]:
+            neighbors.append((cell + 1, v_offset + y * stride + x + 1))
+        if neighbors:
+            n, wall = rng.choice(neighbors)
+            buf[wall] = 0
+            visited[n] = 1
+            stack.append(n)
+        else:
+            stack.pop()
+
+
+def _carve_tile(task) -> None:
+    name, rows, cols, y0, y1, x0, x1, seed = task
+    shm = SharedMemory(name=name)
+    try:
+        _carve(shm.buf, rows, cols, y0, y1, x0, x1, random.Random(seed))
+    finally:
+        shm.close()
+
+
+def _tile_edges(rows: int, cols: int, tile_size: int):
+    ys = list(range(0, rows, tile_size)) + [rows]
+    xs = list(range(0, cols, tile_size)) + [cols]
+    return ys, xs
+
+
+def _stitch(buf, rows: int, cols: int, ys, xs, rng) -> None:
+    # Random spanning tree over the tile grid (randomized DFS), opening one
+    # random seam wall for each tree edge
+    tr, tc = len(ys) - 1, len(xs) - 1
+    v_offset = (rows + 1) * cols
+    visited = bytearray(tr * tc)
+    start = rng.randrange(tr * tc)
+    visited[start] = 1
+    stack = [start]
+    while stack:
+        tile = stack[-1]
+        ty, tx = divmod(tile, tc)
+        neighbors = [(ty + dy, tx + dx) for dy, dx in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                     if 0 <= ty + dy < tr and 0 <= tx + dx < tc
+                     and not visited[(ty + dy) * tc + tx + dx]]
+        if not neighbors:
+            stack.pop()
+            continue
+        ny, nx = rng.choice(neighbors)
+        if ny != ty:
+            # Horizontal seam on row boundary ys[max(ty, ny)]
+            y = ys[max(ty, ny)]
+            x = rng.randrange(xs[tx], xs[tx + 1])
+            buf[y * cols + x] = 0
+        else:
+            x = xs[max(tx, nx)]
+            y = rng.randrange(ys[ty], ys[ty + 1])
+            buf[v_offset + y * (cols + 1) + x] = 0
+        visited[ny * tc + nx] = 1
+        stack.append(ny * tc + nx)
+
+
+def generate_tiled(rows: int, cols: int, workers: int | None = None,
+                   tile_size: int | None = None, seed: int | None = None) -> tuple[BitGrid, BitGrid]:
+    # Returns the (H, V) wall grids of a perfect maze carved by `workers`
+    # processes (in-process when workers == 1).
+    workers = workers or os.cpu_count() or 1
+    rng = random.Random(seed if seed is not None else random.getrandbits(64))
+    if tile_size is None:
+        # About four tiles per worker so uneven tiles still balance out. A
+        # seeded maze must not depend on the machine, so it always gets the
+        # tiling of an 8-worker run.
+        per_tile = 4 * (workers if seed is None else 8)
+        tile_size = max(16, math.ceil(math.sqrt(rows * cols / per_tile)))
+    ys, xs = _tile_edges(rows, cols, tile_size)
+    h_size = (rows + 1) * cols
+    v_size = rows * (cols + 1)
+    shm = SharedMemory(create=True, size=h_size + v_size)
+    try:
+        buf = shm.buf
+        buf[:h_size + v_size] = b'\x01' * (h_size + v_size)
+        tasks = [(shm.name, rows, cols, ys[i], ys[i + 1], xs[j], xs[j + 1], rng.getrandbits(64))
+                 for i in range(len(ys) - 1) for j in range(len(xs) - 1)]
+        if workers == 1:
+            for task in tasks:
+                _carve(buf, rows, cols, *task[3:7], random.Random(task[7]))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunksize = max(1, len(tasks) // (4 * workers))
+                for _ in pool.map(_carve_tile, tasks, chunksize=chunksize):
+                    pass
+        _stitch(buf, rows, cols, ys, xs, rng)
+        H = BitGrid.pack(rows + 1, cols, buf[:h_size])
+        V = BitGrid.pack(rows, cols + 1, buf[h_size:h_size + v_size])
+        del buf
+    finally:
+        shm.close()
+        shm.unlink()
+    return H, V
@@ -0,0 +1,196 @@
+import time
+from collections import OrderedDict
+
+import pygame
+
+from maze_generator import Maze
+from maze_raster import Raster, TARGET, VISITED, PATH
+
+
+class Viewport:
+    # Pan and zoom camera for mazes too large to draw whole. The maze is cut
+    # into square tiles per zoom level, each rendered on first use by
+    # maze_raster (walls, target, and the search overlay) and cached as a
+    # converted Surface. draw() only blits the tiles that intersect the view,
+    # so a frame costs the same however large the maze is.
+    #
+    # The search overlay is kept per cell (visited flags and the path);
+    # marking a cell flags the tile containing it at every level as stale,
+    # and stale or missing tiles are (re)built within a per-frame time budget
+    # so a burst of changes never stalls a frame. Until then a stale tile
+    # keeps its old image and a missing one is drawn grey.
+    LEVELS = (0.125, 0.25, 0.5, 1, 2, 4, 8, 16, 32)  # pixels per cell
+    MAX_TILE_PIXELS = 1 << 25
+    BUILD_BUDGET = 0.006  # seconds of tile building per frame
+    BUCKET = 16  # cells per side of the path index buckets; divides every span
+
+    def __init__(self, maze: Maze, rect):
+        self.rect = pygame.Rect(rect)
+        # Cells per tile side at each level: about 256 pixels of tile, but
+        # between 16 and 256 cells
+        self.spans = [int(min(256, max(16, 256 / ppc))) for ppc in self.LEVELS]
+        self.set_maze(maze)
+
+    def set_maze(self, maze: Maze) -> None:
+        self.maze = maze
+        # Tiles only depend on the walls and the target; moving the start or
+        # the target does not need the planes unpacked again
+        self._key = (maze, maze.walls_version)
+        self._target = maze.target
+        self._planes = (maze.H.unpack(), maze.V.unpack())
+        self._tiles = OrderedDict()
+        self._tile_pixels = 0
+        self._marked = set()
+        self._stale = set()
+        self.clear_overlay()
+        # Start zoomed out just far enough to show the whole maze
+        fit = min(self.rect.width / maze.cols, self.rect.height / maze.rows)
+        self.level = max([i for i, ppc in enumerate(self.LEVELS) if ppc <= fit], default=0)
+        ppc = self.ppc
+        self.x = (maze.cols - self.rect.width / ppc) / 2
+        self.y = (maze.rows - self.rect.height / ppc) / 2
+
+    def clear_overlay(self) -> None:
+        maze = self.maze
+        self.visited = bytearray(maze.rows * maze.cols)
+        self.path = None
+        self._path_buckets = {}
+        # Tiles showing part of the old overlay are redrawn as well as any
+        # already stale; every other cached tile is still current. From here
+        # on _marked collects the tiles the new overlay touches.
+        self._stale = self._stale | self._marked
+        self._marked = set()
+
+    @property
+    def ppc(self) -> float:
+        return self.LEVELS[self.level]
+
+    def _touch(self, y: int, x: int) -> None:
+        for level, span in enumerate(self.spans):
+            key = (level, y // span, x // span)
+            self._stale.add(key)
+            self._marked.add(key)
+
+    def mark(self, y: int, x: int) -> None:
+        self.visited[y * self.maze.cols + x] = 1
+        self._touch(y, x)
+
+    def set_path(self, path) -> None:
+        # Each step of the path is filed under the buckets of both its cells,
+        # so a tile finds every step that fills one of its cells or the gap
+        # between them
+        self.path = path
+        buckets = self._path_buckets
+        b = self.BUCKET
+        prev = None
+        for cell in path:
+            keys = {(cell[0] // b, cell[1] // b)}
+            if prev is not None:
+                keys.add((prev[0] // b, prev[1] // b))
+            for key in keys:
+                buckets.setdefault(key, []).append((prev, cell))
+            self._touch(*cell)
+            prev = cell
+
+    def pan(self, dx: float, dy: float) -> None:
+        # Moves the maze by (dx, dy) screen pixels, keeping part of it in view
+        maze = self.maze
+        ppc = self.ppc
+        view_w, view_h = self.rect.width / ppc, self.rect.height / ppc
+        self.x = min(max(self.x - dx / ppc, -view_w / 2), maze.cols - view_w / 2)
+        self.y = min(max(self.y - dy / ppc, -view_h / 2), maze.rows - view_h / 2)
+
+    def zoom(self, steps: int, anchor=None) -> None:
+        # Changes level by `steps`, keeping the cell under `anchor` (a screen
+        # position, the view centre by default) where it is
+        level = min(max(self.level + steps, 0), len(self.LEVELS) - 1)
+        if level == self.level:
+            return
+        ax, ay = anchor or self.rect.center
+        ax, ay = ax - self.rect.x, ay - self.rect.y
+        old = self.ppc
+        self.level = level
+        new = self.ppc
+        self.x += ax / old - ax / new
+        self.y += ay / old - ay / new
+        self.pan(0, 0)
+
+    def _build(self, key):
+        level, ty, tx = key
+        maze = self.maze
+        span = self.spans[level]
+        ppc = self.LEVELS[level]
+        y0, x0 = ty * span, tx * span
+        rows, cols = min(span, maze.rows - y0), min(span, maze.cols - x0)
+        raster = Raster(maze, max(2, int(ppc)), region=(y0, x0, rows, cols), planes=self._planes)
+        if key in self._marked:
+            raster.fill_cells(self.visited, VISITED)
+            b = self.BUCKET
+            for by in range(y0 // b, -(-(y0 + rows) // b)):
+                for bx in range(x0 // b, -(-(x0 + cols) // b)):
+                    for prev, cell in self._path_buckets.get((by, bx), ()):
+                        raster.draw_path([prev, cell] if prev is not None else [cell], PATH)
+        if raster.contains(*maze.target):
+            raster.fill_cell(*maze.target, TARGET)
+        surface = raster.to_surface().convert()
+        if ppc < 2:
+            surface = pygame.transform.smoothscale(surface, (int(cols * ppc), int(rows * ppc)))
+        return surface
+
+    def _store(self, key, surface) -> None:
+        tiles = self._tiles
+        old = tiles.pop(key, None)
+        if old is not None:
+            self._tile_pixels -= old.get_width() * old.get_height()
+        tiles[key] = surface
+        self._tile_pixels += surface.get_width() * surface.get_height()
+        while self._tile_pixels > self.MAX_TILE_PIXELS and len(tiles) > 1:
+            _, evicted = tiles.popitem(last=False)
+            self._tile_pixels -= evicted.get_width() * evicted.get_height()
+
+    def draw(self, screen) -> None:
+        if self._key != (self.maze, self.maze.walls_version):
+            # Walls were regenerated or edited in place
+            level, x, y = self.level, self.x, self.y
+            self.set_maze(self.maze)
+            self.level, self.x, self.y = level, x, y
+        elif self._target != self.maze.target:
+            # Only the tiles under the old and the new target change
+            for y, x in (self._target, self.maze.target):
+                for level, span in enumerate(self.spans):
+                    self._stale.add((level, y // span, x // span))
+            self._target = self.maze.target
+        maze = self.maze
+        rect = self.rect
+        ppc = self.ppc
+        span = self.spans[self.level]
+        step = span * ppc  # tile pitch in pixels, always a whole number
+        tiles = self._tiles
+        stale = self._stale
+        deadline = time.perf_counter() + self.BUILD_BUDGET
+        screen.fill((255, 255, 255), rect)
+        previous_clip = screen.get_clip()
+        screen.set_clip(rect)
+        ty0 = max(0, int(self.y // span))
+        tx0 = max(0, int(self.x // span))
+        ty1 = min(-(-maze.rows // span), int((self.y + rect.height / ppc) // span) + 1)
+        tx1 = min(-(-maze.cols // span), int((self.x + rect.width / ppc) // span) + 1)
+        left = rect.x - self.x * ppc
+        top = rect.y - self.y * ppc
+        for ty in range(ty0, ty1):
+            for tx in range(tx0, tx1):
+                key = (self.level, ty, tx)
+                pos = (round(left + tx * step), round(top + ty * step))
+                surface = tiles.get(key)
+                if (surface is None or key in stale) and time.perf_counter() < deadline:
+                    surface = self._build(key)
+                    self._store(key, surface)
+                    stale.discard(key)
+                if surface is None:
+                    rows = min(span, maze.rows - ty * span)
+                    cols = min(span, maze.cols - tx * span)
+                    screen.fill((200, 200, 200), (*pos, cols * ppc, rows * ppc))
+                    continue
+                tiles.move_to_end(key)
+                screen.blit(surface, pos)
+        screen.set_clip(previous_clip)
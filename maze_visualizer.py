@@ -1,8 +1,13 @@
 import pygame
+import random
 import time
 
+from maze_cache import MazeCache
 from maze_generator import Maze
-from maze_solver import MazeSolver
+from maze_solver import MazeSolver, DONE
+from maze_race import MazeRace
+from maze_viewport import Viewport
+from search_worker import SearchWorker
 
 class MazeVisualizer:
     COLORS = {
@@ -22,13 +27,23 @@ class MazeVisualizer:
     FIXED_WIDTH = 800
     FIXED_HEIGHT = 800
     GAP = 20
+    FPS = 60
+    # Arrow keys pan the viewport by a quarter of its size
+    PAN_KEYS = {
+        pygame.K_LEFT: (1, 0), pygame.K_RIGHT: (-1, 0), pygame.K_UP: (0, 1), pygame.K_DOWN: (0, -1),
+    }
 
     ALGORITHMS = [
         "A*", "Dijkstra", "Breadth-First Search", "Depth-First Search", "Greedy Best First"
     ]
 
-    def __init__(self, maze: Maze):
+    def __init__(self, maze: Maze, cache: MazeCache | None = None, prefetch: int = 3,
+                 viewport: bool | None = None):
         self.maze = maze
+        # With a cache, Regenerate moves on to the next seed and the
+        # following `prefetch` seeds are generated in the background
+        self.cache = cache
+        self.prefetch = prefetch
         self.width = self.FIXED_WIDTH
         self.height = self.FIXED_HEIGHT + self.BUTTON_HEIGHT + self.GAP
         self.margin = self.MARGIN
@@ -36,205 +51,361 @@ class MazeVisualizer:
         self.cell_size_x = (self.FIXED_WIDTH - 2 * self.margin) // maze.cols
         self.cell_size_y = (self.FIXED_HEIGHT - 2 * self.margin) // maze.rows
         self.cell_size = min(self.cell_size_x, self.cell_size_y)
+        # Mazes too large for 2 pixels per cell are shown through a pan and
+        # zoom Viewport instead of being drawn whole
+        self.use_viewport = self.cell_size < 2 if viewport is None else viewport
+        self.viewport = None
+        self._buttons = None
+        # (maze, version) the cached layers were drawn for; Regenerate with a
+        # cache swaps in another Maze object, whose version may be the same
+        self._layers_key = None
+        self._scaled_walls_key = None
+        # Press M to toggle the solver metrics overlay
+        self.show_metrics = False
+        # Animation speed; + and - double and halve it
+        self.steps_per_second = 100
 
-    def draw_maze(self, screen, path=None, visited=None, lines=None, algo_name=None, elapsed=None):
-        maze = self.maze
-        margin = self.margin
-        cell_size = self.cell_size
-        width = self.width
-        height = self.height
-        button_height = self.button_height
-
-        screen.fill((255, 255, 255))
-        # Draw the target cell
-        target_y, target_x = maze.target
-        rect_x = margin + target_x * cell_size + 2
-        rect_y = margin + target_y * cell_size + 2
-        pygame.draw.rect(screen, (255, 0, 0), (rect_x, rect_y, cell_size - 4, cell_size - 4))
-        # Draw continuous line for search progress with improved fading effect
-        if lines:
-            for ((y1, x1), (y2, x2)) in lines:
-                x1c = margin + x1 * cell_size + cell_size // 2
-                y1c = margin + y1 * cell_size + cell_size // 2
-                x2c = margin + x2 * cell_size + cell_size // 2
-                y2c = margin + y2 * cell_size + cell_size // 2
-                base_color = self.COLORS.get(algo_name, (0, 180, 255))
-                pygame.draw.line(screen, base_color, (x1c, y1c), (x2c, y2c), 4)
-        # Draw path in distinct color for each algorithm
-        if path:
-            path_color = self.COLORS.get(f"{algo_name}_path", (0, 0, 128))
-            for i in range(1, len(path)):
-                py1, px1 = path[i-1]
-                py2, px2 = path[i]
-                x1c = margin + px1 * cell_size + cell_size // 2
-                y1c = margin + py1 * cell_size + cell_size // 2
-                x2c = margin + px2 * cell_size + cell_size // 2
-                y2c = margin + py2 * cell_size + cell_size // 2
-                pygame.draw.line(screen, path_color, (x1c, y1c), (x2c, y2c), 6)
-        # Draw horizontal walls
-        for y in range(maze.rows + 1):
-            for x in range(maze.cols):
-                if maze.H[y][x]:
-                    x1 = margin + x * cell_size
-                    y1 = margin + y * cell_size
-                    x2 = margin + (x + 1) * cell_size
-                    pygame.draw.line(screen, (0, 0, 0), (x1, y1), (x2, y1), 2)
-        # Draw vertical walls
-        for y in range(maze.rows):
-            for x in range(maze.cols + 1):
-                if maze.V[y][x]:
-                    x1 = margin + x * cell_size
-                    y1 = margin + y * cell_size
-                    y2 = margin + (y + 1) * cell_size
-                    pygame.draw.line(screen, (0, 0, 0), (x1, y1), (x1, y2), 2)
-        # Draw algorithm selection buttons and regenerate button in the same row
-        algo_buttons = []
-        algo_count = len(self.ALGORITHMS)
-        total_buttons = algo_count + 1  # +1 for regenerate
+    def _cell_center(self, y, x):
+        half = self.cell_size // 2
+        return (self.margin + x * self.cell_size + half, self.margin + y * self.cell_size + half)
+
+    def _layout_buttons(self):
+        # Button geometry and fonts only depend on the window, so they are
+        # worked out once
+        self.font = pygame.font.SysFont(None, 20)
+        self._info_font = pygame.font.SysFont(None, 40)
+        # Race panels need the whole maze on screen at 1 pixel per cell or
+        # more, so mazes too large for a panel get no Race button
+        race = not self.use_viewport and MazeRace.cell_size_for(self) > 0
+        labels = ["Regenerate"] + self.ALGORITHMS + (["Race"] if race else [])
+        total_buttons = len(labels)
 
         # Calculate button width dynamically to fit all buttons in the row
-        available_width = width - 2 * self.margin - (total_buttons - 1) * 6
+        available_width = self.width - 2 * self.margin - (total_buttons - 1) * 6
         button_widths = []
-        font = pygame.font.SysFont(None, 20)
         min_button_width = 70
         max_button_width = 140
 
         # Measure text width for each button, clamp to min/max, then scale if needed
-        labels = ["Regenerate"] + self.ALGORITHMS
         for label in labels:
-            text_width = font.size(label)[0] + 24  # padding
+            text_width = self.font.size(label)[0] + 24  # padding
             button_widths.append(max(min_button_width, min(text_width, max_button_width)))
 
         total_buttons_width = sum(button_widths) + (total_buttons - 1) * 6
-        scale = 1.0
         if total_buttons_width > available_width:
             scale = available_width / total_buttons_width
             button_widths = [int(w * scale) for w in button_widths]
 
         button_height_algo = 32
-        button_y = height - button_height_algo - 8
+        button_y = self.height - button_height_algo - 8
         rect_x = self.margin
-
-        # Draw regenerate button first
-        regen_rect = pygame.Rect(rect_x, button_y, button_widths[0], button_height_algo)
-        pygame.draw.rect(screen, (0, 120, 255), regen_rect, border_radius=10)
-        text = font.render("Regenerate", True, (255, 255, 255))
-        text_rect = text.get_rect(center=regen_rect.center)
-        screen.blit(text, text_rect)
-        algo_buttons.append((regen_rect, "Regenerate"))
-        rect_x += button_widths[0] + 6
-
-        # Draw algorithm buttons
-        for i, algo in enumerate(self.ALGORITHMS):
-            color = self.COLORS.get(algo, (100, 100, 100))
-            bw = button_widths[i + 1]
-            rect = pygame.Rect(rect_x, button_y, bw, button_height_algo)
-            pygame.draw.rect(screen, color, rect, border_radius=8)
-            algo_text = font.render(algo, True, (255, 255, 255))
-            algo_text_rect = algo_text.get_rect(center=rect.center)
-            screen.blit(algo_text, algo_text_rect)
-            algo_buttons.append((rect, algo))
+        self._buttons = []
+        for label, bw in zip(labels, button_widths):
+            self._buttons.append((pygame.Rect(rect_x, button_y, bw, button_height_algo), label))
             rect_x += bw + 6
 
+    def _build_layers(self):
+        # Pre-render everything that only changes on maze.setup(): the
+        # background with target and buttons, and a transparent wall layer
+        # that is blitted over search lines
+        maze = self.maze
+        margin = self.margin
+        cell_size = self.cell_size
+        if self._buttons is None:
+            self._layout_buttons()
+
+        walls = None
+        if self.viewport is None:
+            walls = pygame.Surface((self.width, self.height))
+            walls.fill((255, 255, 255))
+            walls.set_colorkey((255, 255, 255))
+            self._draw_walls(walls, margin, cell_size, 2)
+
+        background = pygame.Surface((self.width, self.height))
+        background.fill((255, 255, 255))
+        if self.viewport is None:
+            # Draw the target cell
+            target_y, target_x = maze.target
+            rect_x = margin + target_x * cell_size + 2
+            rect_y = margin + target_y * cell_size + 2
+            pygame.draw.rect(background, (255, 0, 0), (rect_x, rect_y, cell_size - 4, cell_size - 4))
+        # Draw regenerate and algorithm buttons in the same row
+        for rect, label in self._buttons:
+            if label == "Regenerate":
+                pygame.draw.rect(background, (0, 120, 255), rect, border_radius=10)
+            else:
+                pygame.draw.rect(background, self.COLORS.get(label, (100, 100, 100)), rect, border_radius=8)
+            text = self.font.render(label, True, (255, 255, 255))
+            background.blit(text, text.get_rect(center=rect.center))
+
+        self._walls = walls
+        self.background = background
+        self._layers_key = (maze, maze.version)
+
+    def draw_metrics(self, screen, metrics):
+        # Opaque box in the top-right corner with the solver's own counters
+        # and timings, which exclude the animation delay in `elapsed`
+        rows = [
+            f"expanded: {metrics.expanded}",
+            f"neighbors scanned: {metrics.neighbors_scanned}",
+            f"pushes: {metrics.pushes}",
+            f"stale pops: {metrics.stale_pops}",
+            f"peak frontier: {metrics.peak_frontier}",
+            f"path length: {metrics.path_length}",
+            f"search: {metrics.search_s * 1000:.2f} ms",
+            f"path: {metrics.path_s * 1000:.2f} ms",
+        ]
+        line_height = self.font.get_linesize()
+        box = pygame.Rect(0, 0, 170, line_height * len(rows) + 12)
+        box.topright = (self.width - self.margin, self.margin)
+        pygame.draw.rect(screen, (240, 240, 240), box)
+        pygame.draw.rect(screen, (0, 0, 0), box, 1)
+        for i, text in enumerate(rows):
+            screen.blit(self.font.render(text, True, (0, 0, 0)), (box.x + 6, box.y + 6 + i * line_height))
+        return box
+
+    def _draw_walls(self, surface, offset, cell_size, width):
+        maze = self.maze
+        # Draw horizontal walls
+        for y, row in enumerate(maze.H):
+            for x, wall in enumerate(row):
+                if wall:
+                    x1 = offset + x * cell_size
+                    y1 = offset + y * cell_size
+                    x2 = offset + (x + 1) * cell_size
+                    pygame.draw.line(surface, (0, 0, 0), (x1, y1), (x2, y1), width)
+        # Draw vertical walls
+        for y, row in enumerate(maze.V):
+            for x, wall in enumerate(row):
+                if wall:
+                    x1 = offset + x * cell_size
+                    y1 = offset + y * cell_size
+                    y2 = offset + (y + 1) * cell_size
+                    pygame.draw.line(surface, (0, 0, 0), (x1, y1), (x1, y2), width)
+
+    def scaled_walls(self, cell_size):
+        # Transparent wall layer at another cell size, for views that draw
+        # the maze smaller; cached until the maze changes
+        key = (self.maze, self.maze.walls_version, cell_size)
+        if self._scaled_walls_key != key:
+            maze = self.maze
+            walls = pygame.Surface((maze.cols * cell_size + 1, maze.rows * cell_size + 1))
+            walls.fill((255, 255, 255))
+            walls.set_colorkey((255, 255, 255))
+            self._draw_walls(walls, 0, cell_size, 1)
+            self._scaled_walls = walls
+            self._scaled_walls_key = key
+        return self._scaled_walls
+
+    def ensure_layers(self):
+        # Rebuilds the cached layers (background, walls, font) if the maze
+        # changed since they were drawn
+        if self._layers_key != (self.maze, self.maze.version):
+            self._build_layers()
+
+    @property
+    def button_row_top(self) -> int:
+        # Top of the button row; everything above it belongs to the maze
+        if self._buttons is None:
+            self._layout_buttons()
+        return self._buttons[0][0].top
+
+    def draw_maze(self, screen, path=None, visited=None, lines=None, algo_name=None, elapsed=None, metrics=None):
+        # Full redraw from the cached layers
+        self.ensure_layers()
+        screen.blit(self.background, (0, 0))
+        if self.viewport is not None:
+            # Walls, search and path all come from the viewport's tiles
+            self.viewport.draw(screen)
+            lines = path = None
+        # Draw continuous line for search progress
+        if lines:
+            base_color = self.COLORS.get(algo_name, (0, 180, 255))
+            for a, b in lines:
+                pygame.draw.line(screen, base_color, self._cell_center(*a), self._cell_center(*b), 4)
+        # Draw path in distinct color for each algorithm
+        if path:
+            path_color = self.COLORS.get(f"{algo_name}_path", (0, 0, 128))
+            for i in range(1, len(path)):
+                pygame.draw.line(screen, path_color, self._cell_center(*path[i-1]), self._cell_center(*path[i]), 6)
+        if self._walls is not None:
+            screen.blit(self._walls, (0, 0))
+
         # Draw algorithm name and time below the maze
         if algo_name and elapsed is not None:
-            info_font = pygame.font.SysFont(None, 40)
             info_text = f"{algo_name}: {elapsed/1000:.2f} s"
-            info_render = info_font.render(info_text, True, (0, 0, 0))
-            info_rect = info_render.get_rect(center=(width // 2, height - button_height - self.GAP // 2))
+            info_render = self._info_font.render(info_text, True, (0, 0, 0))
+            info_rect = info_render.get_rect(center=(self.width // 2, self.height - self.button_height - self.GAP // 2))
             screen.blit(info_render, info_rect)
+        if metrics is not None and self.show_metrics:
+            self.draw_metrics(screen, metrics)
         pygame.display.flip()
-        return algo_buttons[0][0], algo_buttons[1:]  # return regenerate button and algo buttons separately
+        return self._buttons[0][0], self._buttons[1:]  # return regenerate button and algo buttons separately
 
-    def run(self):
+    def draw_segment(self, screen, a, b, algo_name):
+        # Draws one search step onto what is already on screen and returns
+        # the dirty rectangle to pass to pygame.display.update()
+        color = self.COLORS.get(algo_name, (0, 180, 255))
+        rect = pygame.draw.line(screen, color, self._cell_center(*a), self._cell_center(*b), 4).inflate(2, 2)
+        screen.blit(self._walls, rect, rect)
+        return rect
+
+    def regenerate(self) -> Maze:
         maze = self.maze
-        solver = MazeSolver(maze)
+        if self.cache is None:
+            maze.setup()
+            return maze
+        seed = maze.seed + 1 if maze.seed is not None else random.getrandbits(32)
+        key = (maze.rows, maze.cols, maze.algorithm)
+        # Usually already prefetched, so this is a lookup rather than a
+        # generation run
+        self.maze = self.cache.get(*key, seed)
+        self.cache.prefetch(*key, range(seed + 1, seed + 1 + self.prefetch))
+        if self.viewport is not None:
+            self.viewport.set_maze(self.maze)
+        return self.maze
+
+    def open_viewport(self) -> Viewport:
+        # The viewport covers the area the fixed layout would draw the maze in
+        size = (self.FIXED_WIDTH - 2 * self.margin, self.FIXED_HEIGHT - 2 * self.margin)
+        self.viewport = Viewport(self.maze, pygame.Rect((self.margin, self.margin), size))
+        return self.viewport
+
+    def run(self):
         pygame.init()
         screen = pygame.display.set_mode((self.width, self.height))
         pygame.display.set_caption("Maze")
-        maze.setup()
+        maze = self.regenerate()
+        solver = MazeSolver(maze)
+        if self.use_viewport:
+            self.open_viewport()
+        viewport = self.viewport
         button_rect, algo_buttons = self.draw_maze(screen)
-        # algo_buttons[0] is regenerate, algo_buttons[1:] are algorithms
+        clock = pygame.time.Clock()
+        dragging = False
 
         running = True
-        show_search = False
+        worker = None  # SearchWorker of the search being animated
+        race = None  # MazeRace while all algorithms are racing
         search_algo = None
-        search_interrupt = False  # Flag to interrupt search
+        lines = []
+        owed = 0.0  # steps due to be drawn, carried over between frames
+        finished = None  # draw_maze() arguments of the last completed search
 
         while running:
+            # Input is handled every frame, whatever the search is doing
+            clicked_algo = None
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
-                    search_interrupt = True
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_m:
+                        self.show_metrics = not self.show_metrics
+                        if finished:
+                            self.draw_maze(screen, **finished)
+                    elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                        self.steps_per_second = min(self.steps_per_second * 2, 1 << 20)
+                    elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                        self.steps_per_second = max(self.steps_per_second // 2, 1)
+                    elif viewport is not None and event.key in self.PAN_KEYS:
+                        dx, dy = self.PAN_KEYS[event.key]
+                        viewport.pan(dx * viewport.rect.width // 4, dy * viewport.rect.height // 4)
+                    elif viewport is not None and event.key in (pygame.K_PAGEUP, pygame.K_PAGEDOWN):
+                        viewport.zoom(1 if event.key == pygame.K_PAGEUP else -1)
+                elif event.type == pygame.MOUSEWHEEL and viewport is not None:
+                    viewport.zoom(event.y, pygame.mouse.get_pos())
+                elif event.type == pygame.MOUSEBUTTONUP:
+                    dragging = False
+                elif event.type == pygame.MOUSEMOTION and dragging:
+                    viewport.pan(*event.rel)
                 elif event.type == pygame.MOUSEBUTTONDOWN:
+                    if event.button in (4, 5):
+                        continue  # wheel, handled as MOUSEWHEEL
                     if button_rect.collidepoint(event.pos):
-                        maze.setup()
+                        if worker:
+                            worker.cancel()
+                            worker = None
+                        race = None
+                        maze = self.regenerate()
+                        solver = MazeSolver(maze)
                         button_rect, algo_buttons = self.draw_maze(screen)
-                        show_search = False
-                        search_algo = None
-                        search_interrupt = True
+                        finished = None
                     else:
                         for rect, algo in algo_buttons:
                             if rect.collidepoint(event.pos):
-                                show_search = True
-                                search_interrupt = True
-                                search_algo = algo
-            if show_search and search_algo:
-                visited = set()
+                                clicked_algo = algo
+                        if viewport is not None and clicked_algo is None:
+                            dragging = viewport.rect.collidepoint(event.pos)
+            if clicked_algo:
+                # Another algorithm replaces the running search at once
+                if worker:
+                    worker.cancel()
+                    worker = None
+                race = None
+                owed = 0.0
+                finished = None
+            if clicked_algo == "Race":
+                race = MazeRace(self)
+                race.draw(screen)
+            elif clicked_algo:
+                search_algo = clicked_algo
+                worker = SearchWorker(solver, search_algo)
                 lines = []
-                prev = None
+                if viewport is not None:
+                    viewport.clear_overlay()
                 start_time = time.time()
-                # Algorithm selection
-                if search_algo == "A*":
-                    steps = solver.astar_steps()
-                elif search_algo == "Dijkstra":
-                    steps = solver.dijkstra_steps()
-                elif search_algo == "Breadth-First Search":
-                    steps = solver.bfs_steps()
-                elif search_algo == "Depth-First Search":
-                    steps = solver.dfs_steps()
-                elif search_algo == "Greedy Best First":
-                    steps = solver.greedy_best_first_steps()
-                else:
-                    steps = []
-                running_search = True
-                search_interrupt = False  # Reset interrupt for this search
-                for step in steps:
-                    for event in pygame.event.get():
-                        if event.type == pygame.QUIT:
-                            running = False
-                            running_search = False
-                            search_interrupt = True
-                            break
-                        elif event.type == pygame.MOUSEBUTTONDOWN:
-                            # Check if any algo button is clicked
-                            for rect, algo in algo_buttons:
-                                if rect.collidepoint(event.pos):
-                                    search_algo = algo
-                                    search_interrupt = True
-                                    break
-                            if button_rect.collidepoint(event.pos):
-                                maze.setup()
-                                button_rect, algo_buttons = self.draw_maze(screen)
-                                show_search = False
-                                search_algo = None
-                                search_interrupt = True
-                    if not running_search or search_interrupt:
-                        break
-                    if step[0] == 'done':
-                        path = step[1]
-                        elapsed = (time.time() - start_time) * 1000
-                        self.draw_maze(screen, path=path, visited=visited, lines=lines, algo_name=search_algo, elapsed=elapsed)
-                        break
-                    y, x, prev_arr = step
-                    visited.add((y, x))
-                    if prev_arr[y][x] is not None:
-                        lines.append(((y, x), prev_arr[y][x]))
-                    self.draw_maze(screen, path=None, visited=visited, lines=lines, algo_name=search_algo, elapsed=None)
-                    pygame.time.wait(10)
-                # If interrupted by another algo, start it immediately
-                if search_interrupt and running and search_algo:
-                    continue
-                show_search = False
-                search_algo = None
-        pygame.quit()
\ No newline at end of file
+                # Clear the previous search; each step then only redraws its own segment
+                self.draw_maze(screen)
+
+            frame_ms = clock.tick(self.FPS)
+            # Steps are drawn at steps_per_second whatever the frame rate, so
+            # a slow frame is made up by drawing more steps in the next one
+            owed += self.steps_per_second * frame_ms / 1000
+            if race is not None:
+                dirty = race.advance(screen, int(owed))
+                owed %= 1
+                if race.finished:
+                    race = None
+                pygame.display.update([dirty[0].unionall(dirty[1:])] if len(dirty) > 64 else dirty)
+                continue
+            if worker is None:
+                if viewport is not None:
+                    self.draw_maze(screen, **(finished or {}))
+                continue
+            steps = worker.take(int(owed))
+            if len(steps) < int(owed):
+                # The search is behind the animation, not the other way round
+                owed %= 1
+            else:
+                owed -= len(steps)
+            dirty = []
+            for step in steps:
+                if step[0] == DONE:
+                    elapsed = (time.time() - start_time) * 1000
+                    finished = dict(path=step[1], lines=lines, algo_name=search_algo,
+                                    elapsed=elapsed, metrics=worker.metrics)
+                    if viewport is not None:
+                        viewport.set_path(step[1])
+                    self.draw_maze(screen, **finished)
+                    worker = None
+                    dirty = []
+                    break
+                _, (y, x), parent = step
+                if viewport is not None:
+                    viewport.mark(y, x)
+                elif parent is not None:
+                    lines.append(((y, x), parent))
+                    dirty.append(self.draw_segment(screen, (y, x), parent, search_algo))
+            if worker is not None and worker.finished and not steps:
+                worker = None  # the search thread stopped without a result
+            if viewport is not None:
+                if worker is not None:
+                    self.draw_maze(screen)
+                continue
+            if len(dirty) > 64:
+                dirty = [dirty[0].unionall(dirty[1:])]
+            if dirty:
+                pygame.display.update(dirty)
+        if worker:
+            worker.cancel()
+        pygame.quit()
@@ -0,0 +1,92 @@
+import queue
+import threading
+import time
+from collections import deque
+
+from maze_solver import MazeSolver, EXPAND, DONE
+
+
+class SearchWorker:
+    # Runs MazeSolver.steps() on a background thread and hands its events to
+    # the render loop through a bounded queue, so a slow search never holds
+    # up event handling and a fast one cannot run far ahead of the
+    # animation. Events travel in chunks to keep queue traffic low; only the
+    # kinds in `kinds` are forwarded.
+    #
+    # The search collects SolverMetrics, available as `metrics` once DONE has
+    # been taken. Time spent waiting for room in the queue is taken out of
+    # its search time, so it reflects the search rather than the animation.
+    def __init__(self, solver: MazeSolver, algorithm: str, kinds=(EXPAND, DONE),
+                 chunk_size: int = 64, max_chunks: int = 64):
+        self._queue = queue.Queue(max_chunks)
+        self._cancelled = threading.Event()
+        self._pending = deque()
+        self._waited = 0.0
+        self.finished = False
+        self.metrics = None
+        self._thread = threading.Thread(target=self._run, args=(solver, algorithm, kinds, chunk_size),
+                                        daemon=True)
+        self._thread.start()
+
+    def _run(self, solver, algorithm, kinds, chunk_size) -> None:
+        chunk = []
+        try:
+            for step in solver.steps(algorithm, metrics=True):
+                if step[0] == DONE:
+                    metrics = solver.last_metrics
+                    self.metrics = metrics._replace(search_s=max(0.0, metrics.search_s - self._waited))
+                if step[0] in kinds:
+                    chunk.append(step)
+                    if len(chunk) >= chunk_size:
+                        if not self._put(chunk):
+                            return
+                        chunk = []
+            self._put(chunk)
+        finally:
+            # End marker, also sent when the search raised
+            self._put(None)
+
+    def _put(self, item) -> bool:
+        # Blocks while the queue is full; gives up once cancelled
+        started = time.perf_counter()
+        try:
+            while not self._cancelled.is_set():
+                try:
+                    self._queue.put(item, timeout=0.05)
+                    return not self._cancelled.is_set()
+                except queue.Full:
+                    pass
+            return False
+        finally:
+            self._waited += time.perf_counter() - started
+
+    def take(self, limit: int) -> list:
+        # Up to `limit` events that are ready now, without waiting
+        out = []
+        pending = self._pending
+        while len(out) < limit:
+            if not pending:
+                if self.finished:
+                    break
+                try:
+                    chunk = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if chunk is None:
+                    self.finished = True
+                    break
+                pending.extend(chunk)
+                continue
+            out.append(pending.popleft())
+        return out
+
+    def cancel(self) -> None:
+        # Stops the search and waits for the thread, which exits within one
+        # chunk of steps, so the maze can be changed safely right after
+        self._cancelled.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._thread.join()
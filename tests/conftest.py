@@ -0,0 +1,19 @@
+import os
+import sys
+
+# The modules live at the repository root rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Helpers shared by the test modules (import them with `from conftest import`)
+
+def random_cell(maze, rng) -> tuple[int, int]:
+    return rng.randrange(maze.rows), rng.randrange(maze.cols)
+
+
+def random_pairs(maze, count, rng) -> list[tuple]:
+    return [(random_cell(maze, rng), random_cell(maze, rng)) for _ in range(count)]
+
+
+def random_endpoints(maze, rng) -> None:
+    maze.set_endpoints(random_cell(maze, rng), random_cell(maze, rng))
@@ -0,0 +1,36 @@
+import json
+
+from batch_runner import _finished_rows, run_batch
+
+
+def _row(seed):
+    return {"size": 5, "seed": seed, "generator": "dfs", "algorithm": "bfs"}
+
+
+def test_finished_rows_drops_a_cut_line(tmp_path):
+    path = tmp_path / "rows.jsonl"
+    # Enough rows that the last newline is several read chunks back
+    lines = "".join(json.dumps(_row(seed)) + "\n" for seed in range(5000))
+    path.write_text(lines + '{"size": 5, "se')
+    done = _finished_rows(path)
+    assert done == {(5, seed, "dfs", "bfs") for seed in range(5000)}
+    assert path.read_text() == lines
+
+
+def test_finished_rows_without_newline(tmp_path):
+    path = tmp_path / "rows.jsonl"
+    path.write_text('{"size": 5')
+    assert _finished_rows(path) == set()
+    assert path.read_text() == ""
+
+
+def test_rerun_skips_finished_rows(tmp_path):
+    path = tmp_path / "rows.jsonl"
+    assert run_batch(path, [5], range(2), algorithms=["bfs"], workers=1, progress=None) == 2
+    with open(path, "a") as f:
+        f.write('{"size": 5, "seed"')
+    assert run_batch(path, [5], range(3), algorithms=["bfs"], workers=1, progress=None) == 1
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    # Rows are written as jobs finish, so only the first run's come first
+    assert sorted(row["seed"] for row in rows[:2]) == [0, 1]
+    assert rows[2]["seed"] == 2
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from conftest import random_endpoints
+from maze_generator import Maze
+from maze_solver import MazeSolver
+
+
+@pytest.mark.parametrize("algorithm", ["dijkstra", "astar"])
+@pytest.mark.parametrize("generator", Maze.ALGORITHMS)
+def test_contracted_paths_match_cell_paths(algorithm, generator):
+    rng = random.Random(11)
+    for seed in range(4):
+        maze = Maze.generated(rng.randrange(1, 35), rng.randrange(1, 35), generator, seed=seed)
+        solver = MazeSolver(maze)
+        for _ in range(10):
+            random_endpoints(maze, rng)
+            contracted = solver.solve(algorithm, contract=True)
+            assert contracted.path == solver.solve(algorithm).path
+            assert contracted.expanded <= max(1, solver.solve(algorithm).expanded)
+
+
+@pytest.mark.parametrize("algorithm", ["dijkstra", "astar"])
+def test_contracted_paths_on_braided_mazes(algorithm):
+    # Paths are no longer unique, so only their length has to agree
+    rng = random.Random(12)
+    for seed in range(6):
+        maze = Maze.generated(25, 25, seed=seed)
+        maze.braid(0.8, seed=seed)
+        solver = MazeSolver(maze)
+        for _ in range(10):
+            random_endpoints(maze, rng)
+            path = solver.solve(algorithm, contract=True).path
+            assert path[0] == maze.start and path[-1] == maze.target
+            assert len(path) == len(solver.solve("bfs").path)
+            for (y, x), nxt in zip(path, path[1:]):
+                assert nxt in maze.neighbors(y, x)
+
+
+def test_contract_rejects_other_searches_and_metrics():
+    solver = MazeSolver(Maze.generated(8, 8, seed=1))
+    with pytest.raises(ValueError):
+        solver.solve("bfs", contract=True)
+    with pytest.raises(ValueError):
+        solver.solve("astar", contract=True, metrics=True)
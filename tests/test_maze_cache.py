@@ -0,0 +1,57 @@
+import os
+
+import pytest
+
+from maze_cache import MazeCache
+from maze_generator import Maze
+
+
+def same_walls(a, b):
+    return (a.start, a.target, bytes(a.H.data), bytes(a.V.data)) == \
+        (b.start, b.target, bytes(b.H.data), bytes(b.V.data))
+
+
+def test_memory_lru_eviction():
+    with MazeCache(capacity=2) as cache:
+        first = cache.get(6, 6, seed=1)
+        cache.get(6, 6, seed=2)
+        assert cache.get(6, 6, seed=1) is first  # 1 is now the most recent
+        cache.get(6, 6, seed=3)  # evicts 2
+        assert (6, 6, "dfs", 1) in cache and (6, 6, "dfs", 3) in cache
+        assert (6, 6, "dfs", 2) not in cache
+        assert cache.get(6, 6, seed=1) is first
+
+
+@pytest.mark.parametrize("algorithm", Maze.ALGORITHMS)
+def test_prefetch_then_get(algorithm):
+    with MazeCache(capacity=4) as cache:
+        cache.prefetch(9, 13, algorithm, seeds=range(3))
+        assert (9, 13, algorithm, 2) in cache
+        for seed in range(3):
+            maze = cache.get(9, 13, algorithm, seed)
+            assert (maze.algorithm, maze.seed) == (algorithm, seed)
+            assert same_walls(maze, Maze.generated(9, 13, algorithm, seed))
+
+
+def test_reload_from_directory(tmp_path, monkeypatch):
+    with MazeCache(directory=tmp_path) as cache:
+        original = cache.get(8, 11, "eller", seed=4)
+    assert os.listdir(tmp_path) == ["8x11-eller-4.maze"]
+
+    def no_generation(*args, **kwargs):
+        raise AssertionError("the maze should come from the directory")
+    monkeypatch.setattr(Maze, "generated", no_generation)
+    with MazeCache(directory=tmp_path) as cache:
+        loaded = cache.get(8, 11, "eller", seed=4)
+    assert loaded.algorithm == "eller"
+    assert same_walls(loaded, original)
+
+
+def test_directory_keeps_most_recent_files(tmp_path):
+    with MazeCache(capacity=1, directory=tmp_path, disk_capacity=2) as cache:
+        for seed in range(3):
+            cache.get(5, 5, seed=seed)
+        assert sorted(os.listdir(tmp_path)) == ["5x5-dfs-1.maze", "5x5-dfs-2.maze"]
+        cache.get(5, 5, seed=1)  # loaded from disk, so 2 is now the oldest
+        cache.get(5, 5, seed=3)
+        assert sorted(os.listdir(tmp_path)) == ["5x5-dfs-1.maze", "5x5-dfs-3.maze"]
@@ -0,0 +1,74 @@
+import pytest
+
+from maze_generator import Maze
+from maze_io import MazeArchive, MazeArchiveWriter, maze_from_buffer, maze_to_bytes
+
+
+def same_maze(a, b):
+    return ((a.rows, a.cols, a.start, a.target, a.seed, a.algorithm)
+            == (b.rows, b.cols, b.start, b.target, b.seed, b.algorithm)
+            and bytes(a.H.data) == bytes(b.H.data) and bytes(a.V.data) == bytes(b.V.data))
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_file_round_trip(tmp_path, mmap):
+    for algorithm in Maze.ALGORITHMS:
+        maze = Maze.generated(23, 41, algorithm, seed=5)
+        path = tmp_path / f"{algorithm}.maze"
+        maze.save(path)
+        loaded = Maze.load(path, mmap=mmap)
+        assert same_maze(maze, loaded)
+        assert loaded.open_mask() == maze.open_mask()
+
+
+def test_unseeded_maze_keeps_no_seed():
+    maze = Maze(4, 6)
+    assert maze_from_buffer(maze_to_bytes(maze)).seed is None
+
+
+def test_mapped_edits_stay_in_memory(tmp_path):
+    maze = Maze.generated(10, 10, seed=1)
+    path = tmp_path / "m.maze"
+    maze.save(path)
+    loaded = Maze.load(path)
+    loaded.H[5][5] = not loaded.H[5][5]
+    assert same_maze(maze, Maze.load(path))
+
+
+def test_archive_random_access(tmp_path):
+    mazes = [Maze.generated(5 + i, 9 + 2 * i, seed=i) for i in range(6)]
+    path = tmp_path / "all.mzar"
+    with MazeArchiveWriter(path) as writer:
+        for maze in mazes:
+            writer.add(maze)
+    archive = MazeArchive(path)
+    assert len(archive) == len(mazes)
+    assert same_maze(archive[4], mazes[4])
+    assert all(same_maze(a, b) for a, b in zip(archive, mazes))
+
+
+def test_bad_files_are_rejected():
+    data = maze_to_bytes(Maze.generated(6, 6, seed=2))
+    with pytest.raises(ValueError):
+        maze_from_buffer(b'NOPE' + data[4:])
+    with pytest.raises(ValueError):
+        maze_from_buffer(data[:-1])
+    with pytest.raises(ValueError):
+        maze_from_buffer(data[:10])
+
+
+def test_loaded_maze_can_be_regenerated(tmp_path):
+    # The header keeps the algorithm, so (rows, cols, algorithm, seed)
+    # reproduces the saved walls
+    for algorithm in Maze.ALGORITHMS:
+        path = tmp_path / f"{algorithm}.maze"
+        Maze.generated(19, 27, algorithm, seed=-3).save(path)
+        loaded = Maze.load(path)
+        assert loaded.algorithm == algorithm
+        assert same_maze(loaded, Maze.generated(loaded.rows, loaded.cols, loaded.algorithm, loaded.seed))
+
+
+@pytest.mark.parametrize("seed", [1 << 63, -(1 << 63) - 1, 2 ** 64, "abc"])
+def test_seeds_outside_the_header_are_rejected(seed):
+    with pytest.raises(ValueError):
+        Maze.generated(5, 5, seed=seed)
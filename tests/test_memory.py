@@ -0,0 +1,15 @@
+from benchmark import measure_memory
+
+
+def test_wall_storage_at_10000():
+    # The documented figure: 2 bits of wall per cell, 0.25 bytes
+    r = measure_memory(10000, generate=False)
+    assert r["wall_bytes_per_cell"] < 0.26
+
+
+def test_generation_peak():
+    # Generation under tracemalloc is slow, so this runs at a size where
+    # the fixed per-maze overhead still shows; the visited bitset and
+    # stack alone are well under 1.5 bytes per cell
+    r = measure_memory(300)
+    assert r["peak_bytes_per_cell"] < 2.5
@@ -0,0 +1,24 @@
+import random
+
+import pytest
+
+from conftest import random_pairs
+from maze_generator import Maze
+from maze_oracle import TreeOracle, check_against_bfs
+
+
+@pytest.mark.parametrize("algorithm", Maze.ALGORITHMS)
+@pytest.mark.parametrize("rows, cols", [(30, 30), (17, 45), (1, 40), (40, 1)])
+def test_oracle_agrees_with_bfs(algorithm, rows, cols):
+    rng = random.Random(rows * cols)
+    for seed in range(3):
+        maze = Maze.generated(rows, cols, algorithm, seed=seed)
+        oracle = TreeOracle(maze)
+        assert check_against_bfs(oracle, random_pairs(maze, 25, rng)) == []
+
+
+def test_same_cell():
+    maze = Maze.generated(12, 12, seed=4)
+    oracle = TreeOracle(maze)
+    assert oracle.distance((3, 7), (3, 7)) == 0
+    assert oracle.path((3, 7), (3, 7)) == [(3, 7)]
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from conftest import random_pairs
+from maze_generator import Maze
+from maze_queries import BatchSolver, solve_batch
+from maze_solver import MazeSolver
+
+
+def bfs_path(maze, start, target):
+    maze.set_endpoints(start, target)
+    return MazeSolver(maze).solve("bfs").path
+
+
+def check_paths(maze, pairs, result):
+    # Lengths must match BFS; paths on braided mazes need not be the BFS
+    # path, only as short and made of open moves
+    for i, (start, target) in enumerate(pairs):
+        expected = bfs_path(maze, start, target)
+        assert result.lengths[i] == len(expected) - 1
+        path = result.paths[i] if result.paths is not None else None
+        if path is None:
+            continue
+        assert path[0] == start and path[-1] == target and len(path) == len(expected)
+        for a, b in zip(path, path[1:]):
+            assert b in maze.neighbors(*a)
+
+
+@pytest.fixture
+def braided():
+    maze = Maze.generated(30, 30, seed=7)
+    maze.braid(0.6, seed=7)
+    return maze
+
+
+def test_distance_fields_on_braided_maze(braided):
+    pairs = random_pairs(braided, 60, random.Random(1))
+    solver = BatchSolver(braided)
+    result = solver.solve(pairs, paths=True)
+    assert solver.oracle is None
+    check_paths(braided, pairs, result)
+
+
+def test_oracle_on_perfect_maze_and_switch_after_braiding():
+    maze = Maze.generated(30, 30, seed=8)
+    pairs = random_pairs(maze, 40, random.Random(2))
+    solver = BatchSolver(maze)
+    check_paths(maze, pairs, solver.solve(pairs, paths=True))
+    assert solver.oracle is not None
+    # Opening walls adds loops, so the next batch falls back to fields
+    maze.braid(0.5, seed=8)
+    check_paths(maze, pairs, solver.solve(pairs, paths=True))
+    assert solver.oracle is None
+
+
+def test_unreachable_target(braided):
+    # Wall in cell (10, 10) on every side
+    for nb in braided.neighbors(10, 10):
+        braided.set_wall((10, 10), nb, True)
+    result = BatchSolver(braided).solve([((0, 0), (10, 10)), ((10, 10), (0, 0))], paths=True)
+    assert list(result.lengths) == [-1, -1]
+    assert result.paths == [None, None]
+
+
+def test_distance_field_lru(braided):
+    solver = BatchSolver(braided, max_fields=3)
+    solver._prepare()
+    fields = [solver.distance_field(t) for t in (0, 1, 2)]
+    assert solver.distance_field(0) is fields[0]  # hit moves 0 to the back
+    solver.distance_field(3)  # evicts 1, the least recently used
+    assert list(solver._fields) == [2, 0, 3]
+    assert solver.distance_field(1) is not fields[1]
+    assert solver.distance_field(1) == fields[1]
+    # Batches with more targets than max_fields still answer every query
+    pairs = random_pairs(braided, 40, random.Random(3))
+    check_paths(braided, pairs, solver.solve(pairs, paths=True))
+
+
+@pytest.mark.parametrize("paths", [False, True])
+@pytest.mark.parametrize("perfect", [False, True])
+def test_pool_chunks_merge_in_order(braided, paths, perfect):
+    maze = Maze.generated(30, 30, seed=7) if perfect else braided
+    pairs = random_pairs(maze, 45, random.Random(4))
+    result = solve_batch(maze, pairs, paths=paths, workers=2, parallel_threshold=10, chunk_size=7)
+    assert len(result.lengths) == len(pairs)
+    assert (result.paths is None) == (not paths)
+    check_paths(maze, pairs, result)
+    local = solve_batch(maze, pairs, paths=paths, workers=1)
+    assert (result.lengths, result.paths) == (local.lengths, local.paths)
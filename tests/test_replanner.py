@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from conftest import random_cell
+from maze_generator import Maze, OPEN_N, OPEN_S, OPEN_W, OPEN_E
+from maze_replanner import IncrementalPlanner
+from maze_solver import MazeSolver
+
+MOVES = ((OPEN_N, -1, 0), (OPEN_S, 1, 0), (OPEN_W, 0, -1), (OPEN_E, 0, 1))
+
+
+def assert_valid_path(maze, path):
+    mask = maze.open_mask()
+    assert path[0] == maze.start and path[-1] == maze.target
+    for (y, x), nxt in zip(path, path[1:]):
+        assert nxt in [(y + dy, x + dx) for bit, dy, dx in MOVES if mask[y * maze.cols + x] & bit]
+
+
+def random_wall(maze, rng):
+    y, x = rng.randrange(maze.rows), rng.randrange(maze.cols)
+    if rng.random() < 0.5 and y + 1 < maze.rows:
+        return (y, x), (y + 1, x)
+    if x + 1 < maze.cols:
+        return (y, x), (y, x + 1)
+    return (y, x), (y - 1, x) if y else (y + 1, x)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_replans_match_bfs(seed):
+    rng = random.Random(seed)
+    maze = Maze.generated(25, 25, seed=seed)
+    maze.braid(0.5, seed=seed)
+    planner = IncrementalPlanner(maze)
+    solver = MazeSolver(maze)
+    for _ in range(30):
+        action = rng.random()
+        if action < 0.6:
+            for _ in range(3):
+                planner.set_wall(*random_wall(maze, rng), rng.random() < 0.5)
+        elif action < 0.8:
+            planner.move_start(random_cell(maze, rng))
+        else:
+            planner.move_target(random_cell(maze, rng))
+        path = planner.plan().path
+        expected = solver.solve("bfs").path
+        assert len(path) == len(expected)
+        if path:
+            assert_valid_path(maze, path)
+
+
+def test_moving_endpoints_keeps_wall_caches():
+    maze = Maze.generated(20, 20, seed=1)
+    solver = MazeSolver(maze)
+    solver.solve("astar", contract=True)
+    junctions = solver._junctions
+    walls_version = maze.walls_version
+    maze.set_endpoints(start=(0, 0), target=(19, 19))
+    assert maze.walls_version == walls_version
+    assert solver.solve("astar", contract=True).path == solver.solve("bfs").path
+    assert solver._junctions is junctions
+    maze.set_wall((0, 0), (0, 1), True)
+    assert maze.walls_version == walls_version + 1
@@ -0,0 +1,109 @@
+import random
+
+import pytest
+
+from conftest import random_cell, random_endpoints
+from maze_generator import Maze, POPCOUNT
+from maze_solver import MazeSolver, SEARCHES, EXPAND, PUSH, DONE
+
+
+@pytest.mark.parametrize("algorithm", list(SEARCHES))
+@pytest.mark.parametrize("braided", [False, True])
+def test_solve_matches_step_order(algorithm, braided):
+    # solve() runs loops specialised per frontier; they must expand the
+    # same cells in the same order as the shared loop behind steps()
+    rng = random.Random(1)
+    for seed in range(12):
+        maze = Maze.generated(rng.randrange(1, 30), rng.randrange(1, 30), seed=seed)
+        if braided:
+            maze.braid(0.7, seed=seed)
+        if seed % 2:
+            random_endpoints(maze, rng)
+        solver = MazeSolver(maze)
+        fast = solver.solve(algorithm)
+        events = list(solver.steps(algorithm))
+        assert fast.path == events[-1][1]
+        assert fast.expanded == sum(step[0] == EXPAND for step in events)
+        assert fast.pushed == sum(step[0] == PUSH for step in events)
+        assert solver.solve(algorithm, metrics=True)[:4] == fast[:4]
+
+
+@pytest.mark.parametrize("algorithm", list(SEARCHES))
+def test_metrics_match_counts_from_steps(algorithm):
+    rng = random.Random(4)
+    for seed in range(10):
+        maze = Maze.generated(rng.randrange(1, 30), rng.randrange(1, 30), seed=seed)
+        if seed % 2:
+            maze.braid(0.7, seed=seed)
+        random_endpoints(maze, rng)
+        solver = MazeSolver(maze)
+        metrics = solver.solve(algorithm, metrics=True).metrics
+        mask = maze.open_mask()
+        expanded = pushes = scanned = 0
+        frontier = peak = 1
+        for step in solver.steps(algorithm):
+            if step[0] == EXPAND:
+                expanded += 1
+                frontier -= 1
+                y, x = step[1]
+                if step[1] != maze.target:
+                    scanned += POPCOUNT[mask[y * maze.cols + x]]
+            elif step[0] == PUSH:
+                pushes += 1
+                frontier += 1
+                peak = max(peak, frontier)
+            elif step[0] == DONE:
+                path = step[1]
+        assert (metrics.expanded, metrics.pushes, metrics.neighbors_scanned, metrics.path_length) == \
+            (expanded, pushes, scanned, len(path))
+        # No search here pops a stale entry: A* with unit moves and the
+        # Manhattan heuristic, ties going to the lower cost, never improves
+        # a queued cell. So every pop is an EXPAND and the frontier can be
+        # followed from the events alone.
+        assert (metrics.stale_pops, metrics.peak_frontier) == (0, peak)
+        for _ in solver.steps(algorithm, metrics=True):
+            pass
+        assert metrics[:6] == solver.last_metrics[:6]
+
+
+@pytest.mark.parametrize("algorithm", ["dijkstra", "astar", "bfs"])
+def test_shortest_paths(algorithm):
+    rng = random.Random(2)
+    for seed in range(10):
+        maze = Maze.generated(25, 25, seed=seed)
+        maze.braid(1.0, seed=seed)
+        random_endpoints(maze, rng)
+        path = MazeSolver(maze).solve(algorithm).path
+        assert path[0] == maze.start and path[-1] == maze.target
+        assert len(path) == len(MazeSolver(maze).solve("bfs").path)
+        for (y, x), nxt in zip(path, path[1:]):
+            assert nxt in maze.neighbors(y, x)
+
+
+def test_wall_writes_reach_the_solver():
+    maze = Maze.generated(12, 12, seed=3)
+    maze.set_endpoints((0, 0), (11, 11))
+    solver = MazeSolver(maze)
+    assert len(solver.solve("bfs").path) >= 23
+    for y in range(1, 12):
+        for x in range(12):
+            maze.H[y][x] = False
+    for y in range(12):
+        for x in range(1, 12):
+            maze.V[y][x] = False
+    assert len(solver.solve("bfs").path) == 23
+    assert len(solver.solve("astar").path) == 23
+
+
+def test_reused_solver_follows_plain_endpoint_assignment():
+    # Assigning start or target directly must not leave a reused solver
+    # with tables built for the old target
+    rng = random.Random(3)
+    maze = Maze.generated(40, 40, seed=5)
+    maze.braid(0.3, seed=5)
+    solver = MazeSolver(maze)
+    for _ in range(20):
+        maze.start = random_cell(maze, rng)
+        maze.target = random_cell(maze, rng)
+        for algorithm in ("astar", "greedy_best_first"):
+            assert solver.solve(algorithm) == MazeSolver(maze).solve(algorithm)
@@ -0,0 +1,28 @@
+import pytest
+
+from maze_generator import Maze
+from maze_tiles import generate_tiled
+
+
+@pytest.mark.parametrize("rows, cols, tile_size", [(40, 40, 16), (37, 53, 16), (16, 70, 7), (1, 30, 4)])
+@pytest.mark.parametrize("workers", [1, 2])
+def test_stitched_tiles_form_a_perfect_maze(rows, cols, tile_size, workers):
+    for seed in range(3):
+        H, V = generate_tiled(rows, cols, workers=workers, tile_size=tile_size, seed=seed)
+        maze = Maze.from_walls(H, V, (0, 0), (rows - 1, cols - 1))
+        assert maze.is_perfect()
+
+
+def test_seeded_tiling_ignores_worker_count():
+    one = generate_tiled(64, 64, workers=1, seed=7)
+    two = generate_tiled(64, 64, workers=2, seed=7)
+    assert [bytes(g.data) for g in one] == [bytes(g.data) for g in two]
+
+
+def test_is_perfect_rejects_loops_and_islands():
+    maze = Maze.generated(20, 20, "tiled", seed=1)
+    assert maze.is_perfect()
+    maze.braid(1.0, seed=1)
+    assert not maze.is_perfect()
+    walled = Maze(5, 5)
+    assert not walled.is_perfect()